@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+示例脚本（test_example.py、test_module_example.py）共用的辅助函数
+"""
+
+import functools
+import sys
+import tempfile
+
+from i18n_extractor import JavaStringExtractor
+
+
+@functools.lru_cache(maxsize=1)
+def _extractor() -> JavaStringExtractor:
+    return JavaStringExtractor()
+
+
+def shared_extractor() -> JavaStringExtractor:
+    """返回共用的提取器实例，重复运行示例时不再重新创建
+
+    每次取用前先 reset()，上一次运行的键名后缀、AI失败计数等状态不会影响本次结果
+    """
+    extractor = _extractor()
+    extractor.reset()
+    return extractor
+
+
+def temporary_directory() -> tempfile.TemporaryDirectory:
+    """示例用的临时目录，退出 with 块时自动删除
+    
+    Python 3.10+ 忽略删除时的错误（如Windows上文件仍被占用）
+    """
+    if sys.version_info >= (3, 10):
+        return tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+    return tempfile.TemporaryDirectory()
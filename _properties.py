@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Java properties文件的共用解析工具
+
+用一个预编译正则一次扫描整个文件内容，代替逐行 strip/split 的Python循环。
+跳过空行和#注释行，键和值两端的空白（包括全角空格等Unicode空白）会被去除，
+与逐行 str.strip() 的结果一致：
+
+>>> list(iter_properties('a=确定\\u3000\\n\\u3000b = 值 \\n  # c=注释\\n'))
+[('a', '确定'), ('b', '值')]
+"""
+
+import re
+from typing import Dict, Iterator, Tuple
+
+
+# properties文件中的键值对（跳过空行和#注释行），[^\S\n] 为不跨行的空白字符
+_PROP_RE = re.compile(r'^[^\S\n]*(?![#\s])([^=\n]*?)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$', re.MULTILINE)
+
+
+def iter_properties(content: str) -> Iterator[Tuple[str, str]]:
+    """按出现顺序遍历properties内容中的 (key, value)"""
+    return iter(_PROP_RE.findall(content))
+
+
+def load_properties(path) -> Dict[str, str]:
+    """读取properties文件，返回保持原有顺序的 key -> value 映射（重复的key以最后一次为准）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return dict(iter_properties(content))
@@ -9,176 +9,165 @@ Java枚举类国际化更新脚本
 
 import re
 import os
+import sys
 import argparse
+import functools
+import hashlib
+import shutil
 from typing import Dict, List, Tuple, Optional
 
+from _properties import iter_properties
+
+
+# 构造函数（含this.xxx = xxx赋值语句）
+_CTOR_RE = re.compile(r'(\w+)\s*\([^)]*\)\s*\{[^}]*this\.\w+\s*=\s*\w+;', re.MULTILINE | re.DOTALL)
+# 构造函数签名：名称和参数列表
+_FULL_CTOR_RE = re.compile(r'(\w+)\s*\(([^)]*)\)\s*\{')
+# 枚举类体
+_ENUM_SECTION_RE = re.compile(r'enum\s+\w+\s*\{([^}]+)\}', re.DOTALL)
+# 枚举项：名称、参数、结尾符号
+_ENUM_ITEM_RE = re.compile(r'(\w+)\s*\(([^)]*)\)\s*([,;])')
+# 枚举项的单个参数：由引号字符串和非逗号字符组成，引号内的逗号不作为分隔符
+_PARAM_TOKEN_RE = re.compile(r'(?:"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|[^,"\'])+')
+# 构造函数中的字段赋值语句：this.字段 = 参数;
+_ASSIGN_RE = re.compile(r'this\.(\w+)\s*=\s*(\w+)\s*;')
+
+
+def _count_params(params: str) -> int:
+    """统计参数列表字符串中的参数个数"""
+    return sum(1 for param in params.split(',') if param.strip())
+
+
+@functools.lru_cache(maxsize=64)
+def _field_decl_re(field: str) -> re.Pattern:
+    """字段声明的正则，按字段名缓存"""
+    return re.compile(rf'private\s+\w+\s+{re.escape(field)}\s*;')
+
 
 class EnumUpdater:
     def __init__(self, properties_file: str):
         self.properties_file = properties_file
         self.properties_map = self._load_properties()
+        # 构造函数解析结果缓存：文件内容摘要 -> (参数名列表, 参数类型列表)
+        self._constructor_cache: Dict[bytes, Tuple[List[str], List[str]]] = {}
     
     def _load_properties(self) -> Dict[str, str]:
         """加载properties文件，构建value到key的映射"""
         properties_map = {}
         try:
             with open(self.properties_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        # 将value作为key，properties的key作为value存储
-                        properties_map[value.strip()] = key.strip()
+                content = f.read()
+            # 将value作为key，properties的key作为value存储
+            properties_map = {value: key for key, value in iter_properties(content)}
         except FileNotFoundError:
             print(f"警告: 找不到properties文件: {self.properties_file}")
         except Exception as e:
             print(f"读取properties文件时出错: {e}")
         return properties_map
     
-    def _parse_constructor_parameters(self, java_content: str) -> List[str]:
-        """解析构造函数参数，返回参数类型列表"""
-        # 查找构造函数定义
-        constructor_pattern = r'(\w+)\s*\([^)]*\)\s*\{[^}]*this\.\w+\s*=\s*\w+;'
-        constructors = re.findall(constructor_pattern, java_content, re.MULTILINE | re.DOTALL)
-        
-        if not constructors:
-            return []
+    def _analyze_constructors(self, java_content: str) -> Tuple[List[str], List[str]]:
+        """一次扫描找出参数最多的构造函数，返回对齐的 (参数名列表, 参数类型列表)
         
-        # 查找最完整的构造函数（参数最多的）
-        full_constructor_pattern = r'(\w+)\s*\(([^)]*)\)\s*\{'
-        matches = re.findall(full_constructor_pattern, java_content)
-        
-        if not matches:
-            return []
+        无法识别类型和名称的参数在两个列表中以空字符串占位；结果按文件内容缓存
+        """
+        digest = hashlib.md5(java_content.encode('utf-8')).digest()
+        cached = self._constructor_cache.get(digest)
+        if cached is not None:
+            return cached
         
-        # 找到参数最多的构造函数
-        max_params = 0
-        target_params = ""
-        for constructor_name, params in matches:
-            param_count = len([p for p in params.split(',') if p.strip()])
-            if param_count > max_params:
-                max_params = param_count
-                target_params = params
+        # 找到参数最多的构造函数（数量相同时取第一个）
+        target_params = max((params for _, params in _FULL_CTOR_RE.findall(java_content)),
+                            key=_count_params, default='')
         
-        # 解析参数类型
+        # 解析参数名和参数类型
+        param_names = []
         param_types = []
-        if target_params.strip():
-            for param in target_params.split(','):
-                param = param.strip()
-                if param:
-                    # 提取参数类型
-                    parts = param.split()
-                    if len(parts) >= 2:
-                        param_types.append(parts[0])
+        for param in target_params.split(','):
+            parts = param.split()
+            if not parts:
+                continue
+            if len(parts) >= 2:
+                param_types.append(parts[0])
+                param_names.append(parts[1])
+            else:
+                param_types.append('')
+                param_names.append('')
         
-        return param_types
+        result = (param_names, param_types)
+        self._constructor_cache[digest] = result
+        return result
+    
+    def _parse_constructor_parameters(self, java_content: str) -> List[str]:
+        """解析构造函数参数，返回参数类型列表"""
+        # 查找构造函数定义
+        if not _CTOR_RE.search(java_content):
+            return []
+        
+        _, param_types = self._analyze_constructors(java_content)
+        return [param_type for param_type in param_types if param_type]
+    
+    def _field_assignments(self, java_content: str) -> Dict[str, str]:
+        """一次扫描构造函数中的赋值语句，返回 字段名 -> 参数名 的映射（同一字段以第一次赋值为准）"""
+        assignments = {}
+        for field, param in _ASSIGN_RE.findall(java_content):
+            assignments.setdefault(field, param)
+        return assignments
     
     def _find_target_field_position(self, java_content: str, target_field: str) -> int:
         """查找目标字段在构造函数中的位置"""
         # 查找字段声明
-        field_pattern = rf'private\s+\w+\s+{target_field}\s*;'
-        if not re.search(field_pattern, java_content):
+        if not _field_decl_re(target_field).search(java_content):
             print(f"警告: 找不到字段 '{target_field}' 的声明")
             return -1
         
         # 查找构造函数中的赋值语句
-        assignment_pattern = rf'this\.{target_field}\s*=\s*(\w+)\s*;'
-        match = re.search(assignment_pattern, java_content)
+        param_name = self._field_assignments(java_content).get(target_field)
         
-        if not match:
+        if param_name is None:
             print(f"警告: 找不到字段 '{target_field}' 的赋值语句")
             return -1
         
-        param_name = match.group(1)
-        
-        # 查找最完整的构造函数
-        full_constructor_pattern = r'(\w+)\s*\(([^)]*)\)\s*\{'
-        matches = re.findall(full_constructor_pattern, java_content)
-        
-        if not matches:
-            return -1
-        
-        # 找到参数最多的构造函数
-        max_params = 0
-        target_params = ""
-        for constructor_name, params in matches:
-            param_count = len([p for p in params.split(',') if p.strip()])
-            if param_count > max_params:
-                max_params = param_count
-                target_params = params
-        
-        # 查找参数位置
-        if target_params.strip():
-            params = [p.strip() for p in target_params.split(',') if p.strip()]
-            for i, param in enumerate(params):
-                parts = param.split()
-                if len(parts) >= 2 and parts[1] == param_name:
-                    return i
+        # 在最完整的构造函数中查找参数位置
+        param_names, _ = self._analyze_constructors(java_content)
+        if param_name in param_names:
+            return param_names.index(param_name)
         
         return -1
     
-    def _extract_enum_items(self, java_content: str) -> List[Tuple[str, str, List[str]]]:
-        """提取枚举项及其参数"""
+    def _extract_enum_items(self, java_content: str) -> List[Tuple[str, int, int, List[str]]]:
+        """提取枚举项及其参数，返回 (枚举名, 起始位置, 结束位置, 参数列表)，位置相对于整个文件内容"""
         enum_items = []
         
         # 更精确的枚举项匹配模式，避免重复匹配
         # 匹配从枚举名开始到下一个枚举名或类体结束
-        enum_section_pattern = r'enum\s+\w+\s*\{([^}]+)\}'
-        enum_section_match = re.search(enum_section_pattern, java_content, re.DOTALL)
+        enum_section_match = _ENUM_SECTION_RE.search(java_content)
         
         if not enum_section_match:
             return enum_items
         
-        enum_body = enum_section_match.group(1)
-        
-        # 匹配每个枚举项
-        enum_pattern = r'(\w+)\s*\(([^)]*)\)\s*([,;])'
-        matches = re.findall(enum_pattern, enum_body)
-        
-        for enum_name, params_str, separator in matches:
-            # 解析参数
-            params = []
-            if params_str.strip():
-                # 简单的参数分割（处理字符串中的逗号）
-                in_quotes = False
-                current_param = ""
-                quote_char = None
-                
-                for char in params_str:
-                    if char in ['"', "'"] and not in_quotes:
-                        in_quotes = True
-                        quote_char = char
-                        current_param += char
-                    elif char == quote_char and in_quotes:
-                        in_quotes = False
-                        quote_char = None
-                        current_param += char
-                    elif char == ',' and not in_quotes:
-                        params.append(current_param.strip())
-                        current_param = ""
-                    else:
-                        current_param += char
-                
-                if current_param.strip():
-                    params.append(current_param.strip())
+        # 只在枚举类体范围内匹配每个枚举项：用 pos/endpos 限定范围，不复制类体字符串，
+        # 匹配位置直接就是在整个文件内容中的位置
+        for match in _ENUM_ITEM_RE.finditer(java_content, enum_section_match.start(1), enum_section_match.end(1)):
+            enum_name, params_str = match.group(1), match.group(2)
+            # 按逗号分割参数（字符串中的逗号除外）
+            params = [token.strip() for token in _PARAM_TOKEN_RE.findall(params_str) if token.strip()]
             
-            # 构造原始文本
-            original_text = f"{enum_name}({params_str}){separator}"
-            enum_items.append((enum_name, original_text, params))
+            enum_items.append((enum_name, match.start(), match.end(), params))
         
         return enum_items
     
     def _clean_string_value(self, value: str) -> str:
         """清理字符串值，去除引号"""
         value = value.strip()
-        if (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
+        if len(value) >= 2 and value[0] in ('"', "'") and value[-1] == value[0]:
             return value[1:-1]
         return value
     
     def update_enum_file(self, java_file: str, target_field: str = "name", output_file: str = None) -> bool:
         """更新Java枚举文件"""
         try:
-            with open(java_file, 'r', encoding='utf-8') as f:
+            # newline='' 读写时都不转换换行符，更新后的文件保持原有的换行符
+            with open(java_file, 'r', encoding='utf-8', newline='') as f:
                 java_content = f.read()
         except FileNotFoundError:
             print(f"错误: 找不到Java文件: {java_file}")
@@ -203,56 +192,71 @@ class EnumUpdater:
         
         print(f"找到 {len(enum_items)} 个枚举项")
         
-        # 更新枚举项
-        updated_content = java_content
+        # 更新枚举项：按位置顺序一次性拼接出新内容，避免对整个文件反复 replace
+        parts = []
+        last_end = 0
         updates_made = 0
+        # 逐项的处理信息先收集起来，循环结束后一次写出，避免每个枚举项一次输出
+        log = []
         
-        for enum_name, original_text, params in enum_items:
+        for enum_name, start, end, params in enum_items:
+            original_text = java_content[start:end]
             if field_position < len(params):
                 field_value = self._clean_string_value(params[field_position])
-                print(f"处理枚举项 {enum_name}: 字段值 = '{field_value}'")
+                log.append(f"处理枚举项 {enum_name}: 字段值 = '{field_value}'\n")
                 
                 # 在properties中查找对应的key
                 if field_value in self.properties_map:
                     properties_key = self.properties_map[field_value]
-                    print(f"  找到对应的key: {properties_key}")
+                    log.append(f"  找到对应的key: {properties_key}\n")
                     
                     # 检查是否已经包含了这个key
                     if properties_key not in original_text:
-                        # 构造新的枚举项文本
-                        # 移除末尾的逗号或分号
-                        new_text = original_text.rstrip(',;')
-                        # 在最后一个参数后添加新的key参数
-                        if new_text.endswith(')'):
-                            new_text = new_text[:-1] + f',"{properties_key}")'
-                        
-                        # 保持原来的结尾符号
-                        if original_text.endswith(','):
-                            new_text += ','
-                        elif original_text.endswith(';'):
-                            new_text += ';'
+                        # 在参数列表的右括号前添加新的key参数，保持原来的结尾符号
+                        close_paren = java_content.rindex(')', start, end)
+                        new_text = (java_content[start:close_paren] + f',"{properties_key}"'
+                                    + java_content[close_paren:end])
                         
-                        # 替换原文本
-                        updated_content = updated_content.replace(original_text, new_text)
+                        parts.append(java_content[last_end:start])
+                        parts.append(new_text)
+                        last_end = end
                         updates_made += 1
-                        print(f"  已更新: {original_text} -> {new_text}")
+                        log.append(f"  已更新: {original_text} -> {new_text}\n")
                     else:
-                        print(f"  枚举项已包含key: {properties_key}")
+                        log.append(f"  枚举项已包含key: {properties_key}\n")
                 else:
-                    print(f"  未找到对应的key")
+                    log.append(f"  未找到对应的key\n")
             else:
-                print(f"枚举项 {enum_name} 的参数数量不足，无法获取字段值")
+                log.append(f"枚举项 {enum_name} 的参数数量不足，无法获取字段值\n")
+        
+        # 逐项的处理信息一次性输出
+        sys.stdout.write(''.join(log))
+        
+        parts.append(java_content[last_end:])
+        updated_content = ''.join(parts)
         
         # 保存更新后的文件
         output_path = output_file if output_file else java_file
+        # 先完整写入临时文件并落盘，再替换目标文件，中途出错不会留下写了一半的Java文件
+        # 符号链接解析为实际文件，替换后链接仍指向更新后的文件
+        real_path = os.path.realpath(output_path)
+        tmp_path = real_path + '.tmp'
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
                 f.write(updated_content)
+                f.flush()
+                os.fsync(f.fileno())
+            # 目标文件已存在时保留其权限
+            if os.path.exists(real_path):
+                shutil.copymode(real_path, tmp_path)
+            os.replace(tmp_path, real_path)
             print(f"\n成功更新文件: {output_path}")
             print(f"总共更新了 {updates_made} 个枚举项")
             return True
         except Exception as e:
             print(f"保存文件时出错: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             return False
 
 
@@ -11,40 +11,228 @@ Java Spring Boot项目国际化字符串提取工具
 import os
 import re
 import argparse
+import codecs
 import hashlib
+import io
+import itertools
+import zlib
 import json
 import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Set, Dict, List, Optional
-from collections import OrderedDict
+from typing import Set, Dict, List, Optional, Tuple
 import configparser
-import chardet
-import requests
-from dotenv import load_dotenv
+import functools
+
+from _properties import load_properties
+
+# 编码检测时最多分析的字节数
+_ENCODING_DETECT_SAMPLE_SIZE = 64 * 1024
+# 检测结果为这些非GB的东亚编码时，先尝试严格按 gb18030 解码（短小的GBK源文件常被误判为韩文等编码）
+_NON_GB_EAST_ASIAN_CODECS = frozenset({
+    'cp949', 'euc_kr', 'johab', 'iso2022_kr',
+    'big5', 'big5hkscs', 'cp950',
+    'shift_jis', 'cp932', 'shift_jis_2004', 'shift_jisx0213',
+    'euc_jp', 'euc_jis_2004', 'euc_jisx0213', 'iso2022_jp',
+})
+# 文件数少于该值时直接串行扫描，避免进程池的启动开销
+_PARALLEL_SCAN_MIN_FILES = 64
+# 进程池每次分发给工作进程的文件数
+_PARALLEL_SCAN_CHUNK_SIZE = 32
+# 单个字符串最多尝试AI生成键名的次数，之后回退到传统方法
+_AI_KEY_MAX_ATTEMPTS = 5
+# AI键名生成失败后重试的初始等待秒数（指数退避）
+_AI_RETRY_BACKOFF = 0.5
+# AI键名生成连续失败达到该次数后，本次运行不再使用AI
+_AI_DISABLE_AFTER_FAILURES = 10
+# AI键名已存在时，先在本地尝试添加 _2 ~ _N 后缀，都被占用时才重新请求AI
+_AI_KEY_LOCAL_SUFFIXES = 5
+# 扫描项目时跳过的目录（构建输出、版本控制和IDE目录）
+_SKIP_SCAN_DIRS = frozenset({'target', '.git', 'build', '.idea', 'node_modules'})
+
+# 匹配Java字符串的正则表达式
+# 匹配双引号字符串，排除转义字符（内层为非捕获分组，findall 直接返回字符串内容）
+# Java字符串字面量不能跨行，排除换行符后对整个文件匹配与逐行匹配结果一致
+_STRING_RE = re.compile(r'"([^"\\\n]*(?:\\.[^"\\\n]*)*)"')
+# 匹配单行注释
+_SINGLE_COMMENT_RE = re.compile(r'//[^\n]*')
+# 匹配多行注释
+_MULTI_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+# 匹配注解
+_ANNOTATION_RE = re.compile(r'@\w+\s*\([^)]*\)')
+# 多行注释、单行注释、注解合并为一个模式，一次扫描全部移除
+_COMMENT_RE = re.compile('|'.join(pattern.pattern for pattern in (
+    _MULTI_COMMENT_RE, _SINGLE_COMMENT_RE, _ANNOTATION_RE)), re.DOTALL)
+
+# 字符串拼接检测使用的正则片段
+# 字符串字面量（不跨行）
+_JAVA_STRING = r'"(?:[^"\\\n]|\\.)*"'
+# 变量、字段或方法调用表达式，如 name、user.getName()、list.get(i)
+_JAVA_EXPR = r'(?<![\w.])[A-Za-z_][\w.]*(?:\s*\((?:[^()"]|' + _JAVA_STRING + r')*\))?'
+# append 调用的参数：允许包含字符串和一层括号
+_APPEND_ARG = r'(?:[^()"]|' + _JAVA_STRING + r'|\([^()]*\))+'
+_APPEND_CALL = r'\s*\.append\s*\(\s*' + _APPEND_ARG + r'\s*\)'
+_CONCAT_OPERAND = _JAVA_STRING + '|' + _JAVA_EXPR
+# 一次扫描整个文件内容：
+#   字符字面量和不参与拼接的字符串整体跳过，避免从字符串内部开始匹配；
+#   builder 匹配 StringBuilder/StringBuffer 的 append 链式调用；
+#   chain 匹配由 + 连接的字符串和变量（可跨行）
+_CONCAT_SCAN_RE = re.compile(
+    r"'(?:[^'\\\n]|\\.)*'"
+    r'|(?P<builder>new\s+(?:StringBuilder|StringBuffer)\s*\(\s*\)(?:' + _APPEND_CALL + r')+'
+    r'|(?<![\w.])[A-Za-z_]\w*(?:' + _APPEND_CALL + r'){2,})'
+    r'|(?P<chain>(?:' + _CONCAT_OPERAND + r')(?:\s*\+(?![+=])\s*(?:' + _CONCAT_OPERAND + r'))+)'
+    r'|' + _JAVA_STRING
+)
+# 拼接链中的单个操作数：group(1) 为字符串内容，未匹配时为变量表达式
+_CONCAT_PART_RE = re.compile(r'"((?:[^"\\\n]|\\.)*)"|' + _JAVA_EXPR)
+# append 调用及其参数
+_APPEND_CALL_RE = re.compile(r'\.append\s*\(\s*(' + _APPEND_ARG + r')\s*\)')
+# String.format 和 MessageFormat.format 调用，分组为格式字符串的内容
+_FORMAT_CALL_RE = re.compile(r'(?:String|MessageFormat)\.format\s*\(\s*"([^"\\]*(?:\\.[^"\\]*)*)"[^)]*\)')
+
+# 日志相关的方法调用，合并为一个模式，每个上下文只需扫描一次
+_LOG_METHOD_PATTERNS = [
+    r'log\.',  # log.info(), log.error() 等
+    r'Log\.',  # log.info(), log.error() 等
+    r'logger\.',  # logger.info(), logger.error() 等
+    r'Logger\.',  # Logger.getLogger() 等
+    r'LoggerFactory\.',  # LoggerFactory.getLogger() 等
+    r'\.info\s*\(',  # .info()
+    r'\.debug\s*\(',  # .debug()
+    r'\.warn\s*\(',  # .warn()
+    r'\.error\s*\(',  # .error()
+    r'\.trace\s*\(',  # .trace()
+    r'\.logProcessorLog\(',
+    r'System\.out\.print',  # System.out.print/println
+    r'System\.err\.print',  # System.err.print/println
+    r'printStackTrace',  # printStackTrace()
+]
+_LOG_METHOD_RE = re.compile('|'.join(f'(?:{p})' for p in _LOG_METHOD_PATTERNS), re.IGNORECASE)
+
+# 生成AI键名的提示词模板 qwen3 模型需要关闭思考
+# _AI_KEY_PROMPT = """/no_think 请为以下代码块中的字符串
+_AI_KEY_PROMPT = """请为以下代码块中的字符串
+
+```
+{string_value}
+```
+
+生成一个简短的英文键名，要求：
+
+1. 只能使用小写字母、数字和下划线, 不能包含其他字符
+2. 长度不超过50个字符
+3. 只返回最终键名，不要其他内容"""
+# AI返回结果中的 <think>...</think> 标签
+_THINK_TAG_RE = re.compile(r'<think>[.\s]*?</think>')
+# 键名中不允许的字符
+_INVALID_KEY_CHAR_RE = re.compile(r'[^a-zA-Z0-9_]')
+# 连续的下划线
+_MULTI_UNDERSCORE_RE = re.compile(r'_+')
+
+@functools.lru_cache(maxsize=None)
+def _load_env():
+    """加载 .env 中的环境变量，每个进程只加载一次"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+@functools.lru_cache(maxsize=None)
+def _charset_detector():
+    """返回可用的编码检测函数，结果格式与 chardet.detect 相同
+    
+    优先使用C扩展 cchardet，未安装时使用纯Python的 chardet。
+    不使用 charset_normalizer：它的置信度与 chardet 不在同一尺度，0.7 的阈值对它无效
+    """
+    try:
+        import cchardet
+        return cchardet.detect
+    except ImportError:
+        pass
+    import chardet
+    return chardet.detect
+
+class _KeyCharTable(dict):
+    """str.translate 映射表：保留ASCII字母、数字和中文，其余字符替换为下划线
+    
+    首次遇到某个字符时计算映射结果并缓存，之后直接查表
+    """
+    
+    def __missing__(self, code_point: int):
+        char = chr(code_point)
+        if char.isascii() and char.isalnum() or '\u4e00' <= char <= '\u9fff':
+            value = code_point
+        else:
+            value = '_'
+        self[code_point] = value
+        return value
+
+def _iter_java_files(root: Path):
+    """遍历目录树中的Java文件（先序遍历，顺序与 rglob 一致），跳过 _SKIP_SCAN_DIRS 中的目录
+    
+    使用 os.scandir 只为.java文件创建Path对象，并复用DirEntry中缓存的类型信息
+    """
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        sub_dirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_SCAN_DIRS:
+                            sub_dirs.append(entry.path)
+                    elif entry.name.endswith('.java'):
+                        yield Path(entry.path)
+        except OSError:
+            continue
+        # 逆序入栈，使子目录按遍历到的顺序依次处理
+        stack.extend(reversed(sub_dirs))
+
+
+def _reverse_config(config: Dict[str, str]) -> Dict[str, str]:
+    """构建 键值 -> 键名 的反向索引，同一键值对应多个键名时保留第一个"""
+    value_to_key = {}
+    for key, value in config.items():
+        value_to_key.setdefault(value, key)
+    return value_to_key
+
 
 class JavaStringExtractor:
     def __init__(self):
         # 加载环境变量
-        load_dotenv()
-        
-        # 匹配Java字符串的正则表达式
-        # 匹配双引号字符串，排除转义字符
-        self.string_pattern = re.compile(r'"([^"\\]*(\\.[^"\\]*)*)"')
-        # 匹配单行注释
-        self.single_comment_pattern = re.compile(r'//.*$', re.MULTILINE)
-        # 匹配多行注释
-        self.multi_comment_pattern = re.compile(r'/\*.*?\*/', re.DOTALL)
-        # 匹配注解
-        self.annotation_pattern = re.compile(r'@\w+\s*\([^)]*\)', re.MULTILINE)
+        _load_env()
+        
+        # 匹配Java字符串、注释和注解的正则表达式（模块级预编译，所有实例共用）
+        self.string_pattern = _STRING_RE
+        self.single_comment_pattern = _SINGLE_COMMENT_RE
+        self.multi_comment_pattern = _MULTI_COMMENT_RE
+        self.annotation_pattern = _ANNOTATION_RE
+        self.comment_pattern = _COMMENT_RE
         
         # API配置
         self.api_key = os.getenv('OPENAI_API_KEY')
         self.api_base_url = os.getenv('OPENAI_API_BASE_URL', 'https://api.openai.com')
         self.use_ai_key_generation = bool(self.api_key and self.api_base_url)
+        # 复用HTTP连接的会话，首次请求时创建
+        self._session = None
+        # 生成键名使用的模型
+        # self.api_model = 'qwen3:14b'
+        self.api_model = 'gemma3:12b'
+        # AI键名缓存：(模型, 提示词模板, 字符串)的sha256 -> AI返回的键名，保存到文件后可在多次运行之间复用
+        self.ai_key_cache: Dict[str, str] = {}
+        self.ai_key_cache_path: Optional[Path] = None
+        # 配置选项：预先并发请求AI键名的线程数，1表示不预取
+        self.ai_workers = 8
+        # AI键名生成连续失败的次数
+        self._ai_consecutive_failures = 0
         
         # 配置选项：是否忽略日志中的字符串，默认为True
         self.ignore_log_strings = True
         
+        # 配置选项：扫描项目时使用的进程数，None表示使用CPU核数，1表示串行扫描
+        self.scan_workers = None
+        
         # 需要排除的字符串模式
         self.exclude_patterns = [
             r'^\s*$',  # 空字符串或只有空白字符
@@ -56,22 +244,43 @@ class JavaStringExtractor:
             r'^(true|false|null)$',  # Java关键字
             r'^\s*[+\-*/=<>!&|]+\s*$',  # 操作符
         ]
+        # 所有排除模式合并为一个正则，每个字符串只需匹配一次
+        self.exclude_pattern = re.compile('|'.join(f'(?:{p})' for p in self.exclude_patterns))
+        
+        # 传统键名生成时使用的字符映射表
+        self.key_char_table = _KeyCharTable()
         
+        # 文件内容摘要 -> 提取结果，内容完全相同的文件只提取一次
+        self._file_cache: Dict[bytes, Set[str]] = {}
+        # 键名 -> 上次分配的数字后缀，键名冲突时从这里继续查找
+        self._key_suffix_counter: Dict[str, int] = {}
+        # 目录 -> 所属模块路径，同一目录及其上级目录只检查一次pom.xml
+        self._module_path_cache: Dict[Path, Tuple[str, ...]] = {}
+        # 目录 -> 键名的模块前缀
+        self._module_prefix_cache: Dict[Path, str] = {}
+        # 字符串 -> 与上下文无关的检查结果，同一字符串在各文件中重复出现时只检查一次
+        self._candidate_cache: Dict[str, bool] = {}
+
+    def reset(self):
+        """清除上一次运行留下的状态，复用同一个实例时生成的键名与新建实例一致
+
+        键名后缀计数、AI连续失败次数和因连续失败而关闭的AI生成都恢复初始值；
+        项目目录可能已变化，模块路径和前缀缓存也一并清除
+        """
+        self._key_suffix_counter.clear()
+        self._ai_consecutive_failures = 0
+        self.use_ai_key_generation = bool(self.api_key and self.api_base_url)
+        self._module_path_cache.clear()
+        self._module_prefix_cache.clear()
+
     def remove_comments(self, content: str) -> str:
-        """移除Java代码中的注释"""
-        # 移除多行注释
-        content = self.multi_comment_pattern.sub('', content)
-        # 移除单行注释
-        content = self.single_comment_pattern.sub('', content)
-        # 移除注解
-        content = self.annotation_pattern.sub('', content)
-        return content
+        """移除Java代码中的注释和注解"""
+        return self.comment_pattern.sub('', content)
     
     def contains_non_english(self, string_value: str) -> bool:
         """检查字符串是否包含非英文字符(包括中文、日文、韩文等以及非英文标点符号)"""
-        # 匹配非ASCII字符或非英文标点符号
-        non_english_pattern = re.compile(r'[^\x00-\x7F]|[\u2000-\u206F\u2E00-\u2E7F\u3000-\u303F\uFF00-\uFFEF]')
-        return bool(non_english_pattern.search(string_value))
+        # 非英文标点符号（U+2000以上的各个区段）也都是非ASCII字符，只需判断是否全为ASCII
+        return not string_value.isascii()
     
     def is_log_string(self, string_value: str, context: str = "") -> bool:
         """检测字符串是否来自日志语句"""
@@ -87,42 +296,31 @@ class JavaStringExtractor:
                 return True
         
         # 检查上下文是否包含日志相关的方法调用
-        if context:
-            log_method_patterns = [
-                r'log\.',  # log.info(), log.error() 等
-                r'Log\.',  # log.info(), log.error() 等
-                r'logger\.',  # logger.info(), logger.error() 等
-                r'Logger\.',  # Logger.getLogger() 等
-                r'LoggerFactory\.',  # LoggerFactory.getLogger() 等
-                r'\.info\s*\(',  # .info()
-                r'\.debug\s*\(',  # .debug()
-                r'\.warn\s*\(',  # .warn()
-                r'\.error\s*\(',  # .error()
-                r'\.trace\s*\(',  # .trace()
-                r'\.logProcessorLog\(',
-                r'System\.out\.print',  # System.out.print/println
-                r'System\.err\.print',  # System.err.print/println
-                r'printStackTrace',  # printStackTrace()
-            ]
-            
-            for pattern in log_method_patterns:
-                if re.search(pattern, context, re.IGNORECASE):
-                    return True
+        if context and _LOG_METHOD_RE.search(context):
+            return True
         
         return False
     
+    def _is_candidate_string(self, string_value: str) -> bool:
+        """与上下文无关的检查（非英文字符、长度、排除模式），结果按字符串缓存"""
+        result = self._candidate_cache.get(string_value)
+        if result is not None:
+            return result
+        
+        # 只提取包含非英文字符的字符串；绝大多数字面量在这一步就被排除，无需再匹配正则
+        if not string_value or not self.contains_non_english(string_value):
+            result = False
+        else:
+            stripped = string_value.strip()
+            # 检查长度和排除模式（\d、\w 等也匹配非ASCII字符，如全角数字，仍需检查）
+            result = len(stripped) >= 2 and not self.exclude_pattern.match(stripped)
+        
+        self._candidate_cache[string_value] = result
+        return result
+    
     def is_valid_string(self, string_value: str, context: str = "") -> bool:
         """判断字符串是否应该被提取"""
-        if not string_value or len(string_value.strip()) < 2:
-            return False
-            
-        # 检查排除模式
-        for pattern in self.exclude_patterns:
-            if re.match(pattern, string_value.strip()):
-                return False
-        
-        # 只提取包含非英文字符的字符串
-        if not self.contains_non_english(string_value):
+        if not self._is_candidate_string(string_value):
             return False
         
         # 检查是否为日志字符串（如果启用了忽略日志字符串选项）
@@ -131,214 +329,110 @@ class JavaStringExtractor:
                 
         return True
     
-    def detect_encoding(self, file_path: Path) -> str:
-        """检测文件编码"""
+    def detect_encoding(self, raw_data: bytes) -> str:
+        """检测文件内容的编码"""
+        # 带BOM的文件直接确定编码（UTF-32 LE的BOM以UTF-16 LE的BOM开头，需先判断）
+        if raw_data.startswith(b'\xef\xbb\xbf'):
+            return 'utf-8-sig'
+        if raw_data.startswith((b'\xff\xfe\x00\x00', b'\x00\x00\xfe\xff')):
+            return 'utf-32'
+        if raw_data.startswith((b'\xff\xfe', b'\xfe\xff')):
+            return 'utf-16'
+        # 纯ASCII内容按UTF-8处理，无需统计检测
+        if raw_data.isascii():
+            return 'utf-8'
+        
         try:
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result.get('encoding', 'utf-8')
-                confidence = result.get('confidence', 0)
+            # 只分析文件开头的部分内容
+            result = _charset_detector()(raw_data[:_ENCODING_DETECT_SAMPLE_SIZE])
+            encoding = result.get('encoding', 'utf-8')
+            confidence = result.get('confidence', 0)
+            
+            # 如果置信度太低，使用默认编码
+            if confidence < 0.7 or not encoding:
+                return 'utf-8'
+            
+            # 中文项目中GBK文件远比韩文、日文等编码常见，能严格按 gb18030 解码时优先使用
+            if codecs.lookup(encoding).name in _NON_GB_EAST_ASIAN_CODECS:
+                try:
+                    raw_data.decode('gb18030')
+                    return 'gb18030'
+                except UnicodeDecodeError:
+                    pass
                 
-                # 如果置信度太低，使用默认编码
-                if confidence < 0.7:
-                    encoding = 'utf-8'
-                    
-                return encoding
+            return encoding
         except Exception:
             return 'utf-8'
     
     def detect_string_concatenation(self, content: str) -> Dict[str, str]:
-        """检测字符串拼接模式并生成带占位符的完整句子"""
-        detected_strings = {}
+        """检测字符串拼接模式并生成带占位符的完整句子
         
-        # 处理多行字符串拼接
-        self._detect_multiline_concatenation(content, detected_strings)
+        返回 原始代码片段 -> 带占位符的句子 的映射，原始代码片段与内容中的文本完全一致
+        """
+        return {content[start:end]: formatted
+                for start, end, formatted in self._find_concatenation_spans(content)}
+    
+    def _find_concatenation_spans(self, content: str) -> List[Tuple[int, int, str]]:
+        """检测字符串拼接模式，返回 (起始位置, 结束位置, 带占位符的句子) 列表
         
-        # 简化的单行拼接模式检测
-        concatenation_patterns = [
-            # "字符串" + 变量 + "字符串" 模式
-            (r'"([^"\\]*(?:\\.[^"\\]*)*)"\s*\+\s*([a-zA-Z_][a-zA-Z0-9_.]*(?:\([^)]*\))?)\s*\+\s*"([^"\\]*(?:\\.[^"\\]*)*)"', 
-             lambda m: f"{m.group(1)}{{0}}{m.group(3)}"),
-            
-            # "字符串" + 变量 模式
-            (r'"([^"\\]*(?:\\.[^"\\]*)*)"\s*\+\s*([a-zA-Z_][a-zA-Z0-9_.]*(?:\([^)]*\))?)', 
-             lambda m: f"{m.group(1)}{{0}}"),
-            
-            # 变量 + "字符串" 模式
-            (r'([a-zA-Z_][a-zA-Z0-9_.]*(?:\([^)]*\))?)\s*\+\s*"([^"\\]*(?:\\.[^"\\]*)*)"', 
-             lambda m: f"{{0}}{m.group(2)}"),
-        ]
+        单次扫描整个内容，同时识别 + 拼接（含跨行拼接）和 StringBuilder/StringBuffer 的 append 链
+        """
+        spans = []
         
-        # 按行处理字符串拼接
-        lines = content.split('\n')
-        for line in lines:
-            # 跳过不包含拼接的行
-            if '"' not in line or '+' not in line:
+        for match in _CONCAT_SCAN_RE.finditer(content):
+            if match.group('chain') is not None:
+                # "字符串" + 变量 + "字符串" 模式，变量用占位符替代
+                original = match.group('chain')
+                concatenation_parts = []
+                has_literal = False
+                for part in _CONCAT_PART_RE.finditer(original):
+                    literal = part.group(1)
+                    if literal is None:
+                        concatenation_parts.append('{0}')
+                    else:
+                        concatenation_parts.append(literal)
+                        has_literal = True
+                if not has_literal:
+                    continue
+                merged_string = self._merge_concatenation_parts(concatenation_parts)
+            elif match.group('builder') is not None:
+                # 处理 StringBuilder 和 StringBuffer 拼接
+                original = match.group('builder')
+                append_strings = self._extract_append_strings(original)
+                merged_string = self._merge_concatenation_parts(append_strings)
+            else:
                 continue
             
-            line_stripped = line.strip()
-            if not line_stripped:
-                continue
-                
-            # 尝试匹配各种拼接模式
-            for pattern, formatter in concatenation_patterns:
-                matches = re.finditer(pattern, line)
-                for match in matches:
-                    try:
-                        formatted = formatter(match)
-                        # 只保留包含非英文字符的拼接
-                        if self.contains_non_english(formatted):
-                            detected_strings[match.group(0)] = formatted
-                    except:
-                        continue
-        
-        # 处理 StringBuilder 和 StringBuffer 拼接
-        self._detect_string_builder_patterns(content, detected_strings)
+            # 只保留包含非英文字符的拼接
+            if merged_string and self.contains_non_english(merged_string):
+                spans.append((match.start(), match.end(), merged_string))
         
         # 处理 String.format 和 MessageFormat.format
-        format_patterns = {
-            r'String\.format\s*\(\s*"([^"\\]*(?:\\.[^"\\]*)*)"[^)]*\)': r'\1',
-            r'MessageFormat\.format\s*\(\s*"([^"\\]*(?:\\.[^"\\]*)*)"[^)]*\)': r'\1',
-        }
-        
-        for pattern, replacement in format_patterns.items():
-            matches = re.finditer(pattern, content, re.MULTILINE)
-            for match in matches:
-                original = match.group(0)
-                try:
-                    formatted = re.sub(pattern, replacement, original)
-                    if self.contains_non_english(formatted):
-                        detected_strings[original] = formatted
-                except:
-                    continue
+        for match in _FORMAT_CALL_RE.finditer(content):
+            formatted = match.group(1)
+            if self.contains_non_english(formatted):
+                spans.append((match.start(), match.end(), formatted))
         
-        return detected_strings
-    
-    def _detect_multiline_concatenation(self, content: str, detected_strings: Dict[str, str]):
-        """检测跨多行的字符串拼接模式"""
-        # 匹配多行字符串拼接模式
-        # 例如: "字符串1" +
-        #       变量 +
-        #       "字符串2"
-        multiline_pattern = r'"([^"\\]*(?:\\.[^"\\]*)*)"\s*\+\s*(?:\n\s*([a-zA-Z_][a-zA-Z0-9_.]*(?:\([^)]*\))?)\s*\+\s*)*(?:\n\s*)*"([^"\\]*(?:\\.[^"\\]*)*)"'
-        
-        # 更复杂的多行拼接检测
-        lines = content.split('\n')
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # 查找以字符串开始且以 + 结尾的行
-            if '"' in line and line.endswith('+'):
-                concatenation_parts = []
-                original_lines = []
-                
-                # 提取第一行的字符串
-                string_match = re.search(r'"([^"\\]*(?:\\.[^"\\]*)*)"', line)
-                if string_match:
-                    concatenation_parts.append(string_match.group(1))
-                    original_lines.append(line)
-                    
-                    # 继续查找后续行
-                    j = i + 1
-                    while j < len(lines):
-                        next_line = lines[j].strip()
-                        if not next_line:
-                            j += 1
-                            continue
-                            
-                        original_lines.append(next_line)
-                        
-                        # 检查是否为变量 + 
-                        var_match = re.match(r'([a-zA-Z_][a-zA-Z0-9_.]*(?:\([^)]*\))?)\s*\+\s*$', next_line)
-                        if var_match:
-                            concatenation_parts.append('{0}')
-                            j += 1
-                            continue
-                        
-                        # 检查是否为字符串（可能是最后一行）
-                        string_match = re.search(r'"([^"\\]*(?:\\.[^"\\]*)*)"', next_line)
-                        if string_match:
-                            concatenation_parts.append(string_match.group(1))
-                            # 检查是否还有 + 继续
-                            if not next_line.endswith('+'):
-                                # 拼接结束
-                                break
-                            j += 1
-                            continue
-                        
-                        # 如果不匹配任何模式，结束当前拼接检测
-                        break
-                    
-                    # 如果找到了有效的拼接模式
-                    if len(concatenation_parts) > 1:
-                        # 合并连续的字符串字面量
-                        merged_string = self._merge_concatenation_parts(concatenation_parts)
-                        if merged_string and self.contains_non_english(merged_string):
-                            original_code = '\n'.join(original_lines)
-                            detected_strings[original_code] = merged_string
-                    
-                    i = j
-                else:
-                    i += 1
-            else:
-                i += 1
+        return spans
     
     def _merge_concatenation_parts(self, parts: List[str]) -> str:
-        """合并拼接的字符串部分，处理连续的字符串字面量"""
-        if not parts:
-            return ""
-        
+        """合并拼接的字符串部分：'{0}' 标记依次编号为 {0}、{1}…，相邻的字符串字面量直接相连"""
         merged_parts = []
         placeholder_index = 0
-        i = 0
-        while i < len(parts):
-            if parts[i] == '{0}':
+        for part in parts:
+            if part == '{0}':
                 merged_parts.append(f'{{{placeholder_index}}}')
                 placeholder_index += 1
-                i += 1
             else:
-                # 收集连续的字符串字面量
-                literal_part = parts[i]
-                i += 1
-                while i < len(parts) and parts[i] != '{0}':
-                    literal_part += parts[i]
-                    i += 1
-                merged_parts.append(literal_part)
+                merged_parts.append(part)
         
         return ''.join(merged_parts)
     
-    def _detect_string_builder_patterns(self, content: str, detected_strings: Dict[str, str]):
-        """检测 StringBuilder 和 StringBuffer 的字符串拼接模式"""
-        # 匹配 StringBuilder/StringBuffer 的 append 链式调用
-        builder_patterns = [
-            # new StringBuilder().append("字符串").append(变量).append("字符串")
-            r'new\s+(?:StringBuilder|StringBuffer)\s*\(\s*\)(?:\.append\s*\([^)]+\))+',
-            # builder.append("字符串").append(变量).append("字符串")
-            r'[a-zA-Z_][a-zA-Z0-9_]*\.append\s*\([^)]+\)(?:\.append\s*\([^)]+\))+',
-        ]
-        
-        for pattern in builder_patterns:
-            matches = re.finditer(pattern, content, re.MULTILINE | re.DOTALL)
-            for match in matches:
-                builder_code = match.group(0)
-                # 提取所有 append 调用中的字符串
-                append_strings = self._extract_append_strings(builder_code)
-                if append_strings:
-                    # 合并为完整字符串，变量用 {} 替代
-                    merged_string = self._merge_append_strings(append_strings)
-                    if merged_string and self.contains_non_english(merged_string):
-                        detected_strings[builder_code] = merged_string
-    
     def _extract_append_strings(self, builder_code: str) -> List[str]:
         """从 StringBuilder/StringBuffer 代码中提取字符串和变量"""
         append_parts = []
         # 匹配 .append(参数) 调用
-        append_pattern = r'\.append\s*\(([^)]+)\)'
-        matches = re.finditer(append_pattern, builder_code)
-        
-        for match in matches:
+        for match in _APPEND_CALL_RE.finditer(builder_code):
             param = match.group(1).strip()
             # 检查是否为字符串字面量
             if param.startswith('"') and param.endswith('"'):
@@ -351,136 +445,255 @@ class JavaStringExtractor:
         
         return append_parts
     
-    def _merge_append_strings(self, append_parts: List[str]) -> str:
-        """合并 append 的字符串部分，生成完整的模板字符串"""
-        if not append_parts:
-            return ""
-        
-        # 合并连续的字符串字面量
-        merged_parts = []
-        placeholder_index = 0
-        i = 0
-        while i < len(append_parts):
-            if append_parts[i] == '{0}':
-                merged_parts.append(f'{{{placeholder_index}}}')
-                placeholder_index += 1
-                i += 1
-            else:
-                # 收集连续的字符串字面量
-                literal_part = append_parts[i]
-                i += 1
-                while i < len(append_parts) and append_parts[i] != '{0}':
-                    literal_part += append_parts[i]
-                    i += 1
-                merged_parts.append(literal_part)
-        
-        return ''.join(merged_parts)
-    
     def extract_strings_from_file(self, file_path: Path) -> Set[str]:
         """从单个Java文件中提取字符串"""
-        # 检测文件编码
-        detected_encoding = self.detect_encoding(file_path)
+        # 只读取一次文件，之后的哈希、编码检测和解码都在内存中完成
+        try:
+            raw_data = file_path.read_bytes()
+        except Exception as e:
+            print(f"错误: 读取文件 {file_path} 时出错: {e}")
+            return set()
         
-        # 尝试多种编码读取文件
-        encodings_to_try = [detected_encoding, 'utf-8', 'gbk', 'gb2312', 'latin-1']
-        content = None
+        # 多模块项目中常有内容完全相同的文件（如生成的代码），直接复用之前的提取结果
+        digest = hashlib.blake2b(raw_data, digest_size=16).digest()
+        cached = self._file_cache.get(digest)
+        if cached is not None:
+            return cached
         
-        for encoding in encodings_to_try:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
+        content = None
+        try:
+            # 绝大多数Java文件是UTF-8编码，能直接解码时无需检测编码（utf-8-sig 同时去除BOM）
+            content = raw_data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            # 检测文件编码，尝试多种编码解码
+            detected_encoding = self.detect_encoding(raw_data)
+            encodings_to_try = [detected_encoding, 'gbk', 'gb2312', 'latin-1']
+            for encoding in encodings_to_try:
+                try:
+                    content = raw_data.decode(encoding)
                     break
-            except (UnicodeDecodeError, UnicodeError):
-                continue
-            except Exception as e:
-                print(f"错误: 读取文件 {file_path} 时出错: {e}")
-                return set()
+                except (UnicodeDecodeError, UnicodeError, LookupError, TypeError):
+                    continue
         
         if content is None:
             print(f"警告: 无法读取文件 {file_path}，尝试了多种编码")
             return set()
         
+        # 与文本模式读取一致，统一换行符
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        
         # 移除注释
-        cleaned_content = self.remove_comments(content)
+        code_content = self.remove_comments(content)
         
         # 检测字符串拼接模式
-        concatenated_strings = self.detect_string_concatenation(cleaned_content)
+        concatenation_spans = self._find_concatenation_spans(code_content)
         
-        # 从原内容中移除已检测到的拼接模式，避免重复提取
-        for original_pattern in concatenated_strings.keys():
-            cleaned_content = cleaned_content.replace(original_pattern, '')
+        # 按位置一次性移除已检测到的拼接模式，避免重复提取
+        remaining_parts = []
+        last_end = 0
+        for start, end, _ in sorted(concatenation_spans):
+            if start > last_end:
+                remaining_parts.append(code_content[last_end:start])
+            last_end = max(last_end, end)
+        remaining_parts.append(code_content[last_end:])
+        cleaned_content = ''.join(remaining_parts)
         
         # 提取普通字符串
         strings = set()
         
-        # 按行分析，获取每个字符串的上下文
-        lines = cleaned_content.split('\n')
-        for line_num, line in enumerate(lines):
-            line_matches = self.string_pattern.findall(line)
-            for match in line_matches:
-                string_value = match[0]
-                # 传递当前行作为上下文
-                if self.is_valid_string(string_value, line):
-                    strings.add(string_value)
+        # 对整个内容只做一次匹配，仅对通过内容检查的字符串截取所在行作为上下文
+        for match in self.string_pattern.finditer(cleaned_content):
+            string_value = match.group(1)
+            # 已提取的字符串不必再次检查
+            if string_value in strings or not self._is_candidate_string(string_value):
+                continue
+            line_start = cleaned_content.rfind('\n', 0, match.start()) + 1
+            line_end = cleaned_content.find('\n', match.end())
+            if line_end == -1:
+                line_end = len(cleaned_content)
+            # 传递当前行作为上下文
+            if not self.is_log_string(string_value, cleaned_content[line_start:line_end]):
+                strings.add(string_value)
         
         # 添加检测到的拼接字符串
-        for original_pattern, formatted_string in concatenated_strings.items():
+        for start, end, formatted_string in concatenation_spans:
             # 对于拼接字符串，传递原始模式作为上下文
-            if self.is_valid_string(formatted_string, original_pattern):
+            if self.is_valid_string(formatted_string, code_content[start:end]):
                 strings.add(formatted_string)
-                
+        
+        self._file_cache[digest] = strings
         return strings
     
-    def scan_project(self, project_path: Path) -> OrderedDict[str, Path]:
+    def scan_project(self, project_path: Path) -> Dict[str, Path]:
         """扫描整个Java项目，返回字符串到文件路径的有序映射"""
-        all_strings = OrderedDict()  # 字符串 -> 文件路径的映射
-        java_files = list(project_path.rglob('*.java'))
-        
-        # 过滤掉测试目录中的文件
+        all_strings = {}  # 字符串 -> 文件路径的映射（按扫描顺序）
         filtered_java_files = []
         excluded_count = 0
-        for java_file in java_files:
-            # 检查文件路径是否包含测试目录
-            if 'src\\test' in str(java_file) or 'src/test' in str(java_file):
-                excluded_count += 1
-                continue
-            # 检查文件名是否包含 `Test`
-            if 'Test' in java_file.name:
-                excluded_count += 1
-                continue
-            filtered_java_files.append(java_file)
         
-        print(f"找到 {len(java_files)} 个Java文件，排除 {excluded_count} 个测试文件，处理 {len(filtered_java_files)} 个文件")
+        def iter_source_files():
+            """边遍历目录边产出需要处理的文件，过滤掉测试目录中的文件"""
+            nonlocal excluded_count
+            for java_file in _iter_java_files(project_path):
+                # 检查文件路径是否包含测试目录
+                if 'src\\test' in str(java_file) or 'src/test' in str(java_file):
+                    excluded_count += 1
+                    continue
+                # 检查文件名是否包含 `Test`
+                if 'Test' in java_file.name:
+                    excluded_count += 1
+                    continue
+                filtered_java_files.append(java_file)
+                yield java_file
+        
+        source_files = iter_source_files()
+        # 先取出一批文件，文件较少时直接串行扫描，避免进程池的启动开销
+        head_files = list(itertools.islice(source_files, _PARALLEL_SCAN_MIN_FILES))
         
-        for java_file in filtered_java_files:
-            # print(f"正在处理: {java_file}")
-            file_strings = self.extract_strings_from_file(java_file)
+        if self.scan_workers == 1 or len(head_files) < _PARALLEL_SCAN_MIN_FILES:
+            for _ in source_files:
+                pass
+            self._merge_scan_results(all_strings, filtered_java_files,
+                                     map(self.extract_strings_from_file, filtered_java_files))
+        elif os.getenv('I18N_SCAN_USE_THREADS'):
+            # 无法创建子进程的环境可设置该环境变量改用线程池（受GIL限制，加速有限）
+            with ThreadPoolExecutor(max_workers=self.scan_workers) as executor:
+                results = executor.map(self.extract_strings_from_file, itertools.chain(head_files, source_files))
+                self._merge_scan_results(all_strings, filtered_java_files, results)
+        else:
+            # 各文件的提取互不依赖，使用多进程并行处理；map按输入顺序返回结果，保证扫描顺序不变
+            # 文件列表以生成器传入，目录遍历与已分发文件的处理同时进行
+            with ProcessPoolExecutor(max_workers=self.scan_workers,
+                                     initializer=_init_scan_worker,
+                                     initargs=(self,)) as executor:
+                results = executor.map(_scan_file_worker, itertools.chain(head_files, source_files),
+                                       chunksize=_PARALLEL_SCAN_CHUNK_SIZE)
+                self._merge_scan_results(all_strings, filtered_java_files, results)
+        
+        print(f"找到 {len(filtered_java_files) + excluded_count} 个Java文件，排除 {excluded_count} 个测试文件，处理 {len(filtered_java_files)} 个文件")
+            
+        return all_strings
+    
+    def _merge_scan_results(self, all_strings: Dict[str, Path], java_files: List[Path], results):
+        """按扫描顺序合并各文件的提取结果"""
+        for java_file, file_strings in zip(java_files, results):
             # 按扫描顺序添加字符串，自动去重，保留首次出现的文件路径
             for string_value in file_strings:
                 if string_value not in all_strings:
                     all_strings[string_value] = java_file
-            
-        return all_strings
     
     def find_module_path(self, file_path: Path) -> List[str]:
         """查找文件所属的模块路径，返回模块名列表"""
-        modules = []
         current_path = file_path.parent
 
         if "-openservice" in current_path.name:
             print("test")
         
-        # 向上查找包含pom.xml的目录
-        while current_path.parent != current_path:  # 避免到达根目录
-            pom_file = current_path / 'pom.xml'
+        # 向上查找，直到遇到已缓存的目录或根目录，记录途经的目录
+        uncached_dirs = []
+        while current_path not in self._module_path_cache:
+            if current_path.parent == current_path:  # 避免到达根目录
+                self._module_path_cache[current_path] = ()
+                break
+            uncached_dirs.append(current_path)
+            current_path = current_path.parent
+        
+        # 自上而下计算途经目录的模块路径并缓存，同一目录下的文件不再重复检查pom.xml
+        modules = self._module_path_cache[current_path]
+        for directory in reversed(uncached_dirs):
+            pom_file = directory / 'pom.xml'
             if pom_file.exists():
-                module_name = current_path.name.lower()
+                module_name = directory.name.lower()
                 # 过滤掉临时目录名（通常以tmp开头）和其他无意义的目录名
                 if not (module_name.startswith('tmp') or module_name.startswith('temp')):
-                    modules.insert(0, module_name)
-            current_path = current_path.parent
+                    modules = modules + (module_name,)
+            self._module_path_cache[directory] = modules
+            
+        return list(modules)
+    
+    def _module_prefix(self, file_path: Path) -> str:
+        """返回文件所属模块的键名前缀（如 "order-service."），按所在目录缓存"""
+        directory = file_path.parent
+        prefix = self._module_prefix_cache.get(directory)
+        if prefix is None:
+            modules = self.find_module_path(file_path)
+            prefix = ".".join(modules) + "." if modules else ""
+            self._module_prefix_cache[directory] = prefix
+        return prefix
+    
+    def _get_session(self):
+        """获取复用连接的HTTP会话（requests.Session）"""
+        if self._session is None:
+            # 只有启用AI时才会发送请求，按需导入requests，扫描用的工作进程无需加载
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
             
-        return modules
+            session = requests.Session()
+            session.headers.update({
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': 'application/json'
+            })
+            # 连接池大小与并发线程数一致；连接错误和临时性的服务端错误由连接层自动重试
+            pool_size = max(self.ai_workers, 1)
+            retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=frozenset({'POST'}), raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+    
+    def load_ai_key_cache(self, cache_path: Path):
+        """加载AI键名缓存文件"""
+        self.ai_key_cache_path = cache_path
+        if not cache_path.exists():
+            return
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                self.ai_key_cache = json.load(f)
+            print(f"已加载 {len(self.ai_key_cache)} 个AI键名缓存")
+        except Exception as e:
+            print(f"警告: 读取AI键名缓存时出错: {e}")
+    
+    def save_ai_key_cache(self):
+        """保存AI键名缓存文件"""
+        if self.ai_key_cache_path is None or not self.ai_key_cache:
+            return
+        try:
+            with open(self.ai_key_cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.ai_key_cache, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"警告: 保存AI键名缓存时出错: {e}")
+    
+    def prefetch_ai_keys(self, string_values, existing_config: dict):
+        """使用线程池并发请求所有新字符串的AI键名并写入缓存，之后 generate_key 直接命中缓存"""
+        if not self.use_ai_key_generation or self.ai_workers <= 1:
+            return
+        
+        existing_values = set(existing_config.values())
+        pending = []
+        for string_value in dict.fromkeys(value.strip() for value in string_values):
+            if string_value in existing_values:
+                continue
+            if self._ai_cache_key(string_value) not in self.ai_key_cache:
+                pending.append(string_value)
+        
+        if not pending:
+            return
+        
+        print(f"并发请求 {len(pending)} 个字符串的AI键名（{self.ai_workers} 个线程）...")
+        # 先在主线程中创建会话，避免多个线程同时创建
+        self._get_session()
+        # 请求以网络等待为主，使用线程即可并发；失败的字符串之后在 generate_key 中逐个重试
+        with ThreadPoolExecutor(max_workers=self.ai_workers) as executor:
+            for _ in executor.map(self._generate_ai_key, pending):
+                pass
+    
+    def _ai_cache_key(self, string_value: str) -> str:
+        """AI键名缓存的键，模型或提示词模板变化后旧的缓存自动失效"""
+        source = f"{self.api_model}\0{_AI_KEY_PROMPT}\0{string_value}"
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
     
     def _generate_ai_key(self, string_value: str, invalid_keys: set = None) -> str:
         """使用AI生成简短的键名"""
@@ -489,27 +702,20 @@ class JavaStringExtractor:
             
         if invalid_keys is None:
             invalid_keys = set()
+        
+        # 首次请求（没有需要避开的键名）时优先使用缓存
+        cache_key = None
+        if not invalid_keys:
+            cache_key = self._ai_cache_key(string_value)
+            cached_key = self.ai_key_cache.get(cache_key)
+            if cached_key:
+                ai_key = _INVALID_KEY_CHAR_RE.sub('_', cached_key)
+                ai_key = _MULTI_UNDERSCORE_RE.sub('_', ai_key).strip('_').lower()
+                return ai_key, cached_key
             
         try:
-            # 构建API请求
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # 构建提示词 qwen3 模型需要关闭思考
-            # prompt = f"""/no_think 请为以下代码块中的字符串
-            prompt = f"""请为以下代码块中的字符串
-
-```
-{string_value}
-```
-
-生成一个简短的英文键名，要求：
-
-1. 只能使用小写字母、数字和下划线, 不能包含其他字符
-2. 长度不超过50个字符
-3. 只返回最终键名，不要其他内容"""
+            # 构建API请求（认证等请求头由会话统一设置）
+            prompt = _AI_KEY_PROMPT.format(string_value=string_value)
             
             # 如果有无效键名，添加到提示词中
             if invalid_keys:
@@ -519,8 +725,7 @@ class JavaStringExtractor:
 4. 不要返回以下结果 `{invalid_keys_str}`, 请尝试使用简写或拼音或添加数字"""
             
             data = {
-                # 'model': 'qwen3:14b',
-                'model': 'gemma3:12b',
+                'model': self.api_model,
                 'stream': False,
                 'messages': [
                     {
@@ -533,9 +738,8 @@ class JavaStringExtractor:
             }
             
             # 发送请求
-            response = requests.post(
+            response = self._get_session().post(
                 f'{self.api_base_url}/v1/chat/completions',
-                headers=headers,
                 json=data,
                 timeout=10
             )
@@ -548,16 +752,18 @@ class JavaStringExtractor:
                 if "<think>" in ai_key:
                     # print(f"原始AI键名: {ai_key}")
                     # 正则移除 <think>...</think> 标签及其中的内容
-                    ai_key = re.sub(r'<think>[.\s]*?</think>', '', ai_key).strip()
+                    ai_key = _THINK_TAG_RE.sub('', ai_key).strip()
                     # print(f"移除标签后的AI键名: {ai_key}")
                 # 原始结果
                 original_key = ai_key
                 # 清理AI生成的键名
-                ai_key = re.sub(r'[^a-zA-Z0-9_]', '_', ai_key)
-                ai_key = re.sub(r'_+', '_', ai_key).strip('_').lower()
+                ai_key = _INVALID_KEY_CHAR_RE.sub('_', ai_key)
+                ai_key = _MULTI_UNDERSCORE_RE.sub('_', ai_key).strip('_').lower()
                 
                 # if ai_key and len(ai_key) <= 50:
                 if ai_key and len(ai_key) > 0:
+                    if cache_key is not None:
+                        self.ai_key_cache[cache_key] = original_key
                     return ai_key, original_key
                 else:
                     print(f"警告: 【{string_value}】生成的AI键名 `{ai_key}` 不符合要求，已被截断。")
@@ -569,60 +775,76 @@ class JavaStringExtractor:
             
         return None, None
     
-    def generate_key(self, string_value: str, file_path: Path = None, existing_keys: set = None, existing_config: dict = None) -> str:
-        """为字符串生成键，包含模块前缀"""
+    def generate_key(self, string_value: str, file_path: Path = None, existing_keys: set = None,
+                     existing_config: dict = None, value_to_key: dict = None) -> str:
+        """为字符串生成键，包含模块前缀
+        
+        value_to_key 为 键值 -> 键名 的反向索引，批量生成时由调用方维护，避免每次遍历整个配置
+        """
         if existing_keys is None:
             existing_keys = set()
         if existing_config is None:
             existing_config = {}
+        if value_to_key is None:
+            value_to_key = _reverse_config(existing_config)
         
         string_value = string_value.strip()
         # 检查键值是否已存在，如果存在则返回现有的键名
-        for existing_key, existing_value in existing_config.items():
-            if existing_value == string_value:
-                print(f"跳过重复键值: {existing_key} = {string_value}")
-                return existing_key
+        existing_key = value_to_key.get(string_value)
+        if existing_key is not None:
+            print(f"跳过重复键值: {existing_key} = {string_value}")
+            return existing_key
             
         # 生成模块前缀
-        module_prefix = ""
-        if file_path:
-            modules = self.find_module_path(file_path)
-            if modules:
-                module_prefix = ".".join(modules) + "."
+        module_prefix = self._module_prefix(file_path) if file_path else ""
         
-        # 尝试使用AI生成键名
+        # 尝试使用AI生成键名，最多尝试 _AI_KEY_MAX_ATTEMPTS 次，之后回退到传统方法
+        # AI已尝试过（或因连续失败被关闭）时直接回退，无需等待用户确认，避免无人值守运行时卡住
+        ai_exhausted = self.use_ai_key_generation or self._ai_consecutive_failures >= _AI_DISABLE_AFTER_FAILURES
         if self.use_ai_key_generation:
             invalid_keys = set()  # 记录无效的键名
-            attempt = 0
+            failures = 0
             
-            while True:
-                attempt += 1
+            for attempt in range(1, _AI_KEY_MAX_ATTEMPTS + 1):
                 ai_key, original_key = self._generate_ai_key(string_value, invalid_keys)
                 
                 if ai_key:
+                    self._ai_consecutive_failures = 0
                     full_key = module_prefix + ai_key
                     # 检查键名是否已存在
                     if full_key not in existing_keys:
                         if attempt > 1:
                             print(f"AI键名生成成功: '{ai_key}' (尝试第 {attempt} 次)")
                         return full_key
-                    else:
-                        # 记录无效键名
-                        invalid_keys.add(original_key)
-                        print(f"警告: AI生成的键名 `{ai_key}` 已存在，尝试第 {attempt} 次重新生成【{string_value}】的键值...")
+                    # 键名已存在时先在本地添加数字后缀，避免再次请求AI
+                    for suffix in range(2, _AI_KEY_LOCAL_SUFFIXES + 2):
+                        suffixed_key = f"{full_key}_{suffix}"
+                        if suffixed_key not in existing_keys:
+                            print(f"AI生成的键名 `{ai_key}` 已存在，使用 `{suffixed_key}`")
+                            return suffixed_key
+                    # 记录无效键名
+                    invalid_keys.add(original_key)
+                    print(f"警告: AI生成的键名 `{ai_key}` 已存在，尝试第 {attempt} 次重新生成【{string_value}】的键值...")
                 else:
                     # 记录无效键名
                     if original_key:
                         invalid_keys.add(original_key)
                     print(f"警告: 【{string_value}】的AI键名生成失败，尝试第 {attempt} 次... {original_key}")
-                    # 如果连续失败多次，可以考虑退出
-                    # if attempt >= 100:
-                        # print(f"AI键名生成连续失败 {attempt} 次，退出AI生成模式")
-                        # break
-        
-        # 等待用户输入 y/n 决定是否回退到传统方法
-        choice = input("是否回退到传统方法生成键名？(y/n)：").lower()
-        if choice != 'y':
+                    
+                    # 连续失败多次时，本次运行不再使用AI生成键名
+                    self._ai_consecutive_failures += 1
+                    if self._ai_consecutive_failures >= _AI_DISABLE_AFTER_FAILURES:
+                        print(f"AI键名生成连续失败 {self._ai_consecutive_failures} 次，退出AI生成模式")
+                        self.use_ai_key_generation = False
+                        break
+                    
+                    # 指数退避后重试
+                    if attempt < _AI_KEY_MAX_ATTEMPTS:
+                        time.sleep(_AI_RETRY_BACKOFF * 2 ** failures)
+                    failures += 1
+        
+        # 未配置AI时，等待用户输入 y/n 决定是否回退到传统方法
+        if not ai_exhausted and input("是否回退到传统方法生成键名？(y/n)：").lower() != 'y':
             # 停止脚本结束程序
             print("已停止脚本运行。")
             # 在退出前保存当前已处理的配置
@@ -632,18 +854,18 @@ class JavaStringExtractor:
                 print("配置已保存。")
             exit(0)
         
-        # 清理字符串，移除特殊字符
-        cleaned = re.sub(r'[^a-zA-Z0-9\u4e00-\u9fff]', '_', string_value)
-        cleaned = re.sub(r'_+', '_', cleaned).strip('_')
+        # 清理字符串，移除特殊字符，并合并连续的下划线
+        cleaned = string_value.translate(self.key_char_table)
+        cleaned = '_'.join(part for part in cleaned.split('_') if part)
         
         # 如果清理后的字符串太短，使用哈希值
         if len(cleaned) < 2:
-            hash_value = hashlib.md5(string_value.encode('utf-8')).hexdigest()[:8]
+            hash_value = format(zlib.crc32(string_value.encode('utf-8')), '08x')
             base_key = f"str_{hash_value}"
         else:
             # 限制长度
             if len(cleaned) > 50:
-                cleaned = cleaned[:47] + "_" + hashlib.md5(string_value.encode('utf-8')).hexdigest()[:3]
+                cleaned = cleaned[:47] + "_" + format(zlib.crc32(string_value.encode('utf-8')), '08x')[:3]
             base_key = cleaned.lower()
         
         # 确保传统方法生成的键名也是唯一的
@@ -651,15 +873,16 @@ class JavaStringExtractor:
         if full_key not in existing_keys:
             return full_key
         
-        # 添加后缀确保唯一性
-        counter = 1
+        # 添加后缀确保唯一性，从该键名上次使用的后缀开始查找，避免每次都从1开始探测
+        counter = self._key_suffix_counter.get(full_key, 1)
         while f"{full_key}_{counter}" in existing_keys:
             counter += 1
+        self._key_suffix_counter[full_key] = counter
         return f"{full_key}_{counter}"
     
-    def load_existing_config(self, config_path: Path) -> OrderedDict[str, str]:
+    def load_existing_config(self, config_path: Path) -> Dict[str, str]:
         """加载现有的配置文件"""
-        config = OrderedDict()
+        config = {}
         
         if not config_path.exists():
             return config
@@ -667,12 +890,7 @@ class JavaStringExtractor:
         try:
             if config_path.suffix.lower() == '.properties':
                 # Java properties文件格式
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            config[key.strip()] = value.strip()
+                config.update(load_properties(config_path))
             else:
                 # 尝试作为INI文件处理
                 parser = configparser.ConfigParser()
@@ -685,8 +903,8 @@ class JavaStringExtractor:
             
         return config
     
-    def save_config(self, config_path: Path, config: OrderedDict[str, str]):
-        """保存配置文件，包含备份机制"""
+    def save_config(self, config_path: Path, config: Dict[str, str]) -> str:
+        """保存配置文件，包含备份机制，返回写入的文件内容"""
         # 确保目录存在
         config_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -699,16 +917,17 @@ class JavaStringExtractor:
             # 先写入临时文件
             if config_path.suffix.lower() == '.properties':
                 # Java properties文件格式
-                with open(temp_path, 'w', encoding='utf-8') as f:
-                    # 保持原有顺序，不进行排序
-                    for key, value in config.items():
-                        f.write(f"{key}={value}\n")
+                # 保持原有顺序，不进行排序；拼接后一次性写入
+                content = ''.join(f"{key}={value}\n" for key, value in config.items())
             else:
                 # INI文件格式
                 parser = configparser.ConfigParser()
                 parser['DEFAULT'] = config
-                with open(temp_path, 'w', encoding='utf-8') as f:
-                    parser.write(f)
+                buffer = io.StringIO()
+                parser.write(buffer)
+                content = buffer.getvalue()
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
             
             # 如果原文件存在，创建备份
             if config_path.exists():
@@ -717,12 +936,9 @@ class JavaStringExtractor:
                 except Exception as e:
                     print(f"警告: 创建备份文件失败: {e}")
             
-            # 将临时文件重命名为目标文件
+            # 将临时文件重命名为目标文件（os.replace 在Windows上也会原子地覆盖已存在的文件）
             try:
-                # 在Windows上，如果目标文件存在，需要先删除
-                if config_path.exists():
-                    config_path.unlink()
-                shutil.move(temp_path, config_path)
+                os.replace(temp_path, config_path)
             except Exception as e:
                 print(f"错误: 重命名临时文件失败: {e}")
                 # 尝试恢复备份
@@ -733,6 +949,8 @@ class JavaStringExtractor:
                     except Exception:
                         print("警告: 无法从备份恢复配置文件")
                 raise
+            
+            return content
                 
         except Exception as e:
             print(f"错误: 保存配置文件时出错: {e}")
@@ -744,6 +962,18 @@ class JavaStringExtractor:
                     pass
             raise
 
+# 进程池工作进程中使用的提取器，由 _init_scan_worker 在每个进程中设置一次
+_worker_extractor = None
+
+def _init_scan_worker(extractor: JavaStringExtractor):
+    """进程池初始化函数：保存主进程传入的提取器（含编译好的正则和配置）"""
+    global _worker_extractor
+    _worker_extractor = extractor
+
+def _scan_file_worker(file_path: Path) -> Set[str]:
+    """进程池任务：提取单个Java文件中的字符串"""
+    return _worker_extractor.extract_strings_from_file(file_path)
+
 def main():
     parser = argparse.ArgumentParser(description='Java Spring Boot项目国际化字符串提取工具')
     parser.add_argument('--project_dir', default='E:\\LaProjects\\2.15\\Singularity', help='Java项目目录路径')
@@ -752,6 +982,8 @@ def main():
     parser.add_argument('--encoding', default='utf-8', help='文件编码 (默认: utf-8)')
     parser.add_argument('--ignore-log-strings', action='store_true', default=True, help='是否忽略日志中的字符串 (默认: True)')
     parser.add_argument('--include-log-strings', action='store_true', help='包含日志中的字符串 (覆盖 --ignore-log-strings)')
+    parser.add_argument('--workers', type=int, default=None, help='扫描项目时使用的进程数 (默认: CPU核数，1表示串行)')
+    parser.add_argument('--ai-workers', type=int, default=8, help='并发请求AI键名的线程数 (默认: 8，1表示不预取)')
     
     args = parser.parse_args()
     
@@ -772,6 +1004,8 @@ def main():
         print(f"警告: 在项目目录中未找到pom.xml文件，可能不是Maven项目")
     
     extractor = JavaStringExtractor()
+    extractor.scan_workers = args.workers
+    extractor.ai_workers = args.ai_workers
     
     print("开始扫描Java项目...")
     extracted_strings = extractor.scan_project(project_path)
@@ -782,9 +1016,13 @@ def main():
     existing_config = extractor.load_existing_config(config_path)
     print(f"现有配置文件包含 {len(existing_config)} 个条目")
     
+    # 加载AI键名缓存（与配置文件放在同一目录）
+    extractor.load_ai_key_cache(config_path.with_name(f".{config_path.name}.ai_keys.json"))
+    
     # 生成新的键值对
     new_entries = 0
     existing_keys = set(existing_config.keys())
+    value_to_key = _reverse_config(existing_config)
     processed_count = 0
     
     # 设置当前配置和路径，用于异常退出时保存
@@ -792,12 +1030,15 @@ def main():
     extractor._current_config_path = config_path
     
     try:
+        # 并发预取所有新字符串的AI键名
+        extractor.prefetch_ai_keys(extracted_strings, existing_config)
+        
         for string_value, file_path in extracted_strings.items():
             # 传递已存在的键名集合和配置，确保生成唯一键名和键值
-            key = extractor.generate_key(string_value, file_path, existing_keys, existing_config)
+            key = extractor.generate_key(string_value, file_path, existing_keys, existing_config, value_to_key)
             
             # 如果返回的是已存在的键名（重复键值），则跳过处理
-            if key in existing_config and existing_config[key] == string_value:
+            if existing_config.get(key) == string_value:
                 processed_count += 1
                 continue
             
@@ -807,6 +1048,7 @@ def main():
             if key not in existing_config:
                 existing_config[key] = string_value
                 existing_keys.add(key)  # 更新已存在键名集合
+                value_to_key.setdefault(string_value, key)
                 new_entries += 1
                 # print(f"新增: {key} = {string_value}")
             
@@ -829,6 +1071,9 @@ def main():
         extractor.save_config(config_path, existing_config)
         print(f"已保存 {processed_count} 个处理结果到配置文件。")
         raise
+    finally:
+        # 无论正常结束、中断还是出错，都保存已获取的AI键名，下次运行可直接复用
+        extractor.save_ai_key_cache()
     
     # 最终保存配置文件
     extractor.save_config(config_path, existing_config)
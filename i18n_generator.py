@@ -9,12 +9,27 @@ Java i18n 多语言配置文件生成器
 import os
 import re
 import json
+import hashlib
+import functools
+import sqlite3
 import requests
 import argparse
 import signal
 import sys
-from typing import Dict, List, Tuple
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 可选依赖：安装了C扩展 orjson 时用它编码请求体、解析响应，否则使用标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 加载环境变量
 load_dotenv()
@@ -23,6 +38,26 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 OPENAI_API_BASE_URL = os.getenv('OPENAI_API_BASE_URL', 'https://api.openai.com')
 MODEL_NAME = 'qwen3:14b'
+# 匹配 {数字} 或 {变量名} 格式的占位符（与 \{\w*\d*\w*\} 匹配的内容相同，但不会回溯）
+PLACEHOLDER_PATTERN = re.compile(r'\{\w*\}')
+# 中文字符（CJK统一表意文字及扩展A、兼容表意文字）
+CJK_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+# HTTP连接池大小，不小于并发翻译的线程数时所有请求都能复用连接
+HTTP_POOL_SIZE = 32
+
+# 语言映射
+LANGUAGE_NAMES = {
+    'en': '英文',
+    'fr': '法文', 
+    'de': '德文',
+    'ja': '日文',
+    'ko': '韩文',
+    'es': '西班牙文',
+    'it': '意大利文',
+    'pt': '葡萄牙文',
+    'ru': '俄文',
+    'ar': '阿拉伯文'
+}
 
 
 def count_placeholders(text: str) -> int:
@@ -35,9 +70,10 @@ def count_placeholders(text: str) -> int:
     Returns:
         int: 占位符数量
     """
-    # 匹配 {数字} 或 {变量名} 格式的占位符
-    placeholders = re.findall(r'\{\w*\d*\w*\}', text)
-    return len(placeholders)
+    # 不含左花括号的文本（绝大多数配置项）不可能有占位符
+    if '{' not in text:
+        return 0
+    return len(PLACEHOLDER_PATTERN.findall(text))
 
 
 def validate_placeholder_count(source_value: str, translated_value: str) -> bool:
@@ -51,11 +87,25 @@ def validate_placeholder_count(source_value: str, translated_value: str) -> bool
     Returns:
         bool: 占位符数量是否一致
     """
+    if '{' not in source_value and '{' not in translated_value:
+        return True
     source_count = count_placeholders(source_value)
     translated_count = count_placeholders(translated_value)
     return source_count == translated_count
 
 
+def needs_translation(text: str) -> bool:
+    """
+    判断文本是否需要翻译：不含中文的文本（URL、数字、占位符、英文标识符等）直接使用原文
+    
+    Args:
+        text: 源配置值
+        
+    Returns:
+        bool: 是否包含需要翻译的中文
+    """
+    return not text.isascii() and CJK_PATTERN.search(text) is not None
+
 def parse_properties_file(file_path: str) -> List[Tuple[str, str]]:
     """
     解析properties文件，返回键值对列表，保持原始顺序
@@ -88,7 +138,274 @@ def parse_properties_file(file_path: str) -> List[Tuple[str, str]]:
                 
     return properties
 
-def translate_property_line(key: str, source_value: str, target_language: str = 'en') -> str:
+def detect_line_ending(file_path: str) -> str:
+    """
+    检测现有properties文件使用的换行符，重新生成时保持不变，避免整个文件在版本控制中出现差异
+    
+    Args:
+        file_path: properties文件路径
+        
+    Returns:
+        str: 文件中的换行符，文件不存在或没有换行时为当前平台的换行符
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(64 * 1024)
+    except FileNotFoundError:
+        return os.linesep
+    if b'\r\n' in head:
+        return '\r\n'
+    if b'\n' in head:
+        return '\n'
+    return os.linesep
+
+# 响应头中的时间长度，如 1s、6m0s、20ms
+DURATION_PART_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+DURATION_UNIT_SECONDS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+def parse_duration(value: Optional[str]) -> float:
+    """
+    解析 x-ratelimit-reset-* / retry-after 响应头中的时间长度
+    
+    Args:
+        value: 响应头的值，如 "20"、"1s"、"6m0s"、"20ms"
+        
+    Returns:
+        float: 秒数，无法解析时返回0
+    """
+    if not value:
+        return 0.0
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    return float(sum(float(number) * DURATION_UNIT_SECONDS[unit] for number, unit in DURATION_PART_PATTERN.findall(value)))
+
+class RateLimiter:
+    """
+    客户端请求限速：按滑动窗口限制每分钟请求数，并根据响应头中的 x-ratelimit-* 和 retry-after 主动暂停
+    """
+    
+    def __init__(self, rpm: int = 0):
+        # 每分钟最多发送的请求数，0表示不限制
+        self.rpm = rpm
+        self._lock = threading.Lock()
+        # 最近一分钟内发送请求的时间
+        self._timestamps = deque()
+        # 服务端额度用完后，暂停发送请求直到该时间
+        self._paused_until = 0.0
+    
+    def acquire(self) -> None:
+        """
+        等待直到允许发送下一个请求
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0 and self.rpm > 0:
+                    while self._timestamps and now - self._timestamps[0] >= 60:
+                        self._timestamps.popleft()
+                    if len(self._timestamps) >= self.rpm:
+                        wait = 60 - (now - self._timestamps[0])
+                if wait <= 0:
+                    if self.rpm > 0:
+                        self._timestamps.append(now)
+                    return
+            time.sleep(wait)
+    
+    def update(self, response: requests.Response) -> None:
+        """
+        根据响应头调整限速：请求数或token额度用完、或被限流时，暂停到额度重置
+        """
+        headers = response.headers
+        pause = 0.0
+        if response.status_code == 429:
+            pause = parse_duration(headers.get('retry-after')) or 1.0
+        for kind in ('requests', 'tokens'):
+            if headers.get(f'x-ratelimit-remaining-{kind}', '').strip() == '0':
+                pause = max(pause, parse_duration(headers.get(f'x-ratelimit-reset-{kind}')))
+        if pause > 0:
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+# 所有翻译线程共用的限速器
+rate_limiter = RateLimiter()
+
+# 复用连接的HTTP会话，首次请求时创建
+http_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """
+    获取复用连接的HTTP会话，多个翻译线程共用
+    
+    Returns:
+        requests.Session: 带连接池和自动重试的会话
+    """
+    global http_session
+    with _session_lock:
+        if http_session is None:
+            session = requests.Session()
+            session.headers.update({
+                'Authorization': f'Bearer {OPENAI_API_KEY}',
+                'Content-Type': 'application/json',
+                'Connection': 'keep-alive'
+            })
+            # 连接错误、限流和临时性的服务端错误由连接层自动重试：指数退避加随机抖动，
+            # 服务端返回 Retry-After 时按其等待
+            retry = Retry(total=6, backoff_factor=1, backoff_max=60, backoff_jitter=1,
+                          status_forcelist=(429, 500, 502, 503, 504), respect_retry_after_header=True,
+                          allowed_methods=frozenset({'POST'}), raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            http_session = session
+    return http_session
+
+def json_loads(data):
+    """
+    解析JSON（str 或 bytes），优先使用 orjson
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def request_chat_completion(prompt: str, max_tokens: int, system_prompt: Optional[str] = None) -> Optional[str]:
+    """
+    发送一次对话补全请求
+    
+    Args:
+        prompt: 提示词
+        max_tokens: 最大生成token数
+        system_prompt: 系统提示词，固定不变的要求放在这里，服务端可以复用其前缀缓存
+        
+    Returns:
+        Optional[str]: 去除 <think> 标签后的回复内容，请求失败时返回None
+    """
+    messages = []
+    if system_prompt:
+        messages.append({
+            'role': 'system',
+            'content': system_prompt
+        })
+    messages.append({
+        'role': 'user',
+        'content': prompt
+    })
+    
+    # 构建API请求（认证等请求头由会话统一设置）
+    data = {
+        'model': MODEL_NAME,
+        'messages': messages,
+        'temperature': 0.3,
+        'max_tokens': max_tokens
+    }
+    
+    # 发送API请求
+    api_url = f"{OPENAI_API_BASE_URL.rstrip('/')}/v1/chat/completions"
+    rate_limiter.acquire()
+    if orjson is not None:
+        # orjson 直接输出UTF-8字节，Content-Type 已由会话设置
+        response = get_session().post(api_url, data=orjson.dumps(data), timeout=30)
+    else:
+        response = get_session().post(api_url, json=data, timeout=30)
+    rate_limiter.update(response)
+    
+    if response.status_code != 200:
+        print(f"API请求失败: {response.status_code} - {response.text}")
+        return None
+    
+    result = json_loads(response.content)
+    content = result['choices'][0]['message']['content'].strip()
+    # 如果结果中包含 <think> 标签
+    # 则使用正则移除 <think>...</think> 标签及其中的内容
+    if "<think>" in content:
+        content = re.sub(r'<think>[.\s]*?</think>', '', content).strip()
+    return content
+
+def translation_max_tokens(source_value: str) -> int:
+    """
+    按原文长度估算翻译结果需要的最大token数，短文本不必预留过多
+    """
+    return min(150, max(32, 4 * len(source_value)))
+
+@functools.lru_cache(maxsize=None)
+def translation_system_prompt(target_language: str) -> str:
+    """
+    单条翻译的系统提示词，每种目标语言只构建一次
+    """
+    # qwen3 模型需要关闭思考
+    return f"""/no_think 根据用户给出的中文 i18n 多语言配置 properties，生成对应的 _{target_language} 配置，要求：
+1. 保持键名不变，只翻译值部分
+2. 翻译要准确、自然，适合软件界面国际化
+3. 确保占位符数量要一致，不能多也不能少
+4. 只返回翻译后的值，不要包含键名和等号
+5. 不要添加任何额外的说明或格式"""
+
+@functools.lru_cache(maxsize=None)
+def batch_system_prompt(target_language: str) -> str:
+    """
+    批量翻译的系统提示词，每种目标语言只构建一次
+    """
+    target_lang_name = LANGUAGE_NAMES.get(target_language, f'{target_language}语')
+    # qwen3 模型需要关闭思考
+    return f"""/no_think 根据中文的 i18n 多语言配置 properties，将用户给出的 JSON 数组中每一项的值 v 翻译为{target_lang_name}（_{target_language} 配置），要求：
+1. 翻译要准确、自然，适合软件界面国际化
+2. 确保每一项的占位符数量与原文一致，不能多也不能少
+3. 按原数组顺序返回一个与输入等长的 JSON 字符串数组，每个元素是对应项翻译后的值
+4. 只返回 JSON 数组，不要添加任何额外的说明或格式"""
+
+@functools.lru_cache(maxsize=None)
+def translation_prefix_pattern(target_lang_name: str) -> re.Pattern:
+    """
+    AI返回结果中可能带有的前缀，按目标语言缓存编译后的正则
+    
+    Args:
+        target_lang_name: 目标语言名称，如 英文
+        
+    Returns:
+        re.Pattern: 匹配开头前缀的正则（按顺序尝试，与逐个 startswith 检查一致）
+    """
+    prefixes = [
+        f'{target_lang_name}翻译值：',
+        f'{target_lang_name}翻译：',
+        'Translation:',
+        '翻译值：',
+        '翻译：'
+    ]
+    return re.compile('|'.join(re.escape(prefix) for prefix in prefixes))
+
+def clean_translation(key: str, translation: str, target_lang_name: str) -> str:
+    """
+    清理AI返回的翻译结果，移除可能的前缀、键名和引号
+    
+    Args:
+        key: 配置项的键
+        translation: AI返回的内容
+        target_lang_name: 目标语言名称，如 英文
+        
+    Returns:
+        str: 清理后的配置值
+    """
+    # 移除常见的前缀
+    prefix_match = translation_prefix_pattern(target_lang_name).match(translation)
+    if prefix_match:
+        translation = translation[prefix_match.end():].strip()
+    
+    # 移除可能包含的键名部分（如果AI返回了完整行）
+    if '=' in translation and translation.startswith(key):
+        translation = translation.split('=', 1)[1].strip()
+    
+    # 移除引号（如果有的话）
+    if translation.startswith('"') and translation.endswith('"'):
+        translation = translation[1:-1]
+    elif translation.startswith("'") and translation.endswith("'"):
+        translation = translation[1:-1]
+    return translation
+
+def translate_property_line(key: str, source_value: str, target_language: str = 'en') -> Optional[str]:
     """
     使用AI模型翻译整行配置到目标语言
     
@@ -98,149 +415,336 @@ def translate_property_line(key: str, source_value: str, target_language: str =
         target_language: 目标语言代码 (如: en, fr, de, ja, ko 等)
         
     Returns:
-        str: 翻译后的配置值
+        Optional[str]: 翻译后的配置值，重试后请求仍失败时返回None
     """
     if not OPENAI_API_KEY:
         print("错误: 未设置OPENAI_API_KEY，无法进行翻译")
-        return source_value
+        return None
     
     try:
-        # 构建API请求
-        headers = {
-            'Authorization': f'Bearer {OPENAI_API_KEY}',
-            'Content-Type': 'application/json'
-        }
-        
-        # 语言映射
-        language_names = {
-            'en': '英文',
-            'fr': '法文', 
-            'de': '德文',
-            'ja': '日文',
-            'ko': '韩文',
-            'es': '西班牙文',
-            'it': '意大利文',
-            'pt': '葡萄牙文',
-            'ru': '俄文',
-            'ar': '阿拉伯文'
-        }
-        
-        target_lang_name = language_names.get(target_language, f'{target_language}语')
+        target_lang_name = LANGUAGE_NAMES.get(target_language, f'{target_language}语')
         
         # 构建完整的配置行
         source_line = f"{key}={source_value}"
         
-        # 构建提示词 qwen3 模型需要关闭思考
-        # prompt = f"""根据中文的 i18n 多语言配置 properties：
-        prompt = f"""/no_think 根据中文的 i18n 多语言配置 properties：
-`{source_line}`
-
-生成对应的 _{target_language} 配置，要求：
-1. 保持键名不变，只翻译值部分
-2. 翻译要准确、自然，适合软件界面国际化
-3. 确保占位符数量要一致，不能多也不能少
-4. 只返回翻译后的值，不要包含键名和等号
-5. 不要添加任何额外的说明或格式
+        # 构建提示词，固定的要求放在系统提示词中
+        prompt = f"""`{source_line}`
 
 {target_lang_name}翻译值："""
         
-        data = {
-            'model': MODEL_NAME,
-            'messages': [
-                {
-                    'role': 'user',
-                    'content': prompt
-                }
-            ],
-            'temperature': 0.3,
-            'max_tokens': 150
-        }
-        
-        # 发送API请求
-        api_url = f"{OPENAI_API_BASE_URL.rstrip('/')}/v1/chat/completions"
-        response = requests.post(api_url, headers=headers, json=data, timeout=30)
-        
-        if response.status_code == 200:
-            result = response.json()
-            translation = result['choices'][0]['message']['content'].strip()
-            # 如果结果中包含 <think> 标签
-            # 则使用正则移除 <think>...</think> 标签及其中的内容
-            if "<think>" in translation:
-                # print(f"原始AI键名: {translation}")
-                # 正则移除 <think>...</think> 标签及其中的内容
-                translation = re.sub(r'<think>[.\s]*?</think>', '', translation).strip()
-                # print(f"移除标签后的AI键名: {translation}")
-            
-            # 清理翻译结果，移除可能的前缀和后缀
-            # 移除常见的前缀
-            prefixes_to_remove = [
-                f'{target_lang_name}翻译值：',
-                f'{target_lang_name}翻译：',
-                'Translation:',
-                '翻译值：',
-                '翻译：'
-            ]
-            
-            for prefix in prefixes_to_remove:
-                if translation.startswith(prefix):
-                    translation = translation[len(prefix):].strip()
-                    break
-            
-            # 移除可能包含的键名部分（如果AI返回了完整行）
-            if '=' in translation and translation.startswith(key):
-                translation = translation.split('=', 1)[1].strip()
-            
-            # 移除引号（如果有的话）
-            if translation.startswith('"') and translation.endswith('"'):
-                translation = translation[1:-1]
-            elif translation.startswith("'") and translation.endswith("'"):
-                translation = translation[1:-1]
-            
+        translation = request_chat_completion(prompt, translation_max_tokens(source_value),
+                                              translation_system_prompt(target_language))
+        
+        if translation is not None:
+            translation = clean_translation(key, translation, target_lang_name)
             print(f"AI翻译: \n{key}={source_value}\n{key}={translation}")
             return translation
         else:
-            print(f"API请求失败: {response.status_code} - {response.text}")
-            return source_value
+            return None
             
     except Exception as e:
         print(f"翻译API调用出错: {e}")
-        return source_value
+        return None
+
+def refine_placeholder_translation(key: str, source_value: str, translation: str,
+                                   target_language: str) -> Optional[str]:
+    """
+    占位符数量不一致时，把原文和当前翻译一起交给AI修正，而不是重新翻译
+    
+    Args:
+        key: 配置项的键
+        source_value: 源配置项的值
+        translation: 占位符数量不一致的翻译
+        target_language: 目标语言代码
+        
+    Returns:
+        Optional[str]: 修正后的配置值，请求失败时返回None
+    """
+    target_lang_name = LANGUAGE_NAMES.get(target_language, f'{target_language}语')
+    source_placeholders = PLACEHOLDER_PATTERN.findall(source_value)
+    prompt = f"""以下{target_lang_name}翻译的占位符数量与原文不一致。原文有 {len(source_placeholders)} 个占位符 {' '.join(source_placeholders)}，翻译有 {count_placeholders(translation)} 个。
+原文：`{key}={source_value}`
+当前翻译：{translation}
+
+请输出修正后的{target_lang_name}翻译值，只返回值："""
+    
+    try:
+        refined = request_chat_completion(prompt, translation_max_tokens(source_value),
+                                          translation_system_prompt(target_language))
+    except Exception as e:
+        print(f"翻译API调用出错: {e}")
+        return None
+    if refined is None:
+        return None
+    refined = clean_translation(key, refined, target_lang_name)
+    print(f"AI修正: \n{key}={source_value}\n{key}={refined}")
+    return refined
+
+def translate_with_retry(key: str, source_value: str, target_language: str,
+                         translation: Optional[str] = None) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    翻译配置项，占位符数量不一致时请AI修正当前翻译
+    
+    Args:
+        key: 配置项的键
+        source_value: 源配置项的值
+        target_language: 目标语言代码
+        translation: 已有的翻译（如批量翻译的结果），为None时先翻译
+        
+    Returns:
+        Tuple[Optional[str], Optional[dict]]: 翻译结果（请求失败时为None），以及修正后仍不匹配时的记录（匹配时为None）
+    """
+    max_refinements = 2
+    target_value = translation
+    if target_value is None:
+        target_value = translate_property_line(key, source_value, target_language)
+        if target_value is None:
+            # 连接层已重试过，不再重复请求
+            return None, None
+    
+    for refinement_count in range(1, max_refinements + 1):
+        # 验证占位符数量
+        if validate_placeholder_count(source_value, target_value):
+            return target_value, None
+        
+        print(f"警告: 占位符数量不匹配 {key}")
+        print(f"  原文占位符数量: {count_placeholders(source_value)}, 翻译占位符数量: {count_placeholders(target_value)}")
+        print(f"  第 {refinement_count} 次修正...")
+        refined = refine_placeholder_translation(key, source_value, target_value, target_language)
+        if refined is None:
+            break
+        target_value = refined
+    
+    if validate_placeholder_count(source_value, target_value):
+        return target_value, None
+    
+    print(f"  修正后占位符数量仍不匹配，使用最后一次翻译结果")
+    # 返回占位符不匹配的配置项记录
+    return target_value, {
+        'key': key,
+        'source_value': source_value,
+        'translated_value': target_value,
+        'source_placeholders': count_placeholders(source_value),
+        'translated_placeholders': count_placeholders(target_value)
+    }
+
+def translate_batch(items: List[Tuple[str, str]], target_language: str) -> Optional[List[str]]:
+    """
+    在一次请求中翻译多个配置项
+    
+    Args:
+        items: (键, 源配置值) 列表
+        target_language: 目标语言代码
+        
+    Returns:
+        Optional[List[str]]: 与items顺序一致的翻译结果，请求失败或返回格式不正确时返回None
+    """
+    if not OPENAI_API_KEY:
+        return None
+    
+    source_json = json.dumps([{'k': key, 'v': value} for key, value in items], ensure_ascii=False)
+    
+    # 构建提示词，固定的要求放在系统提示词中
+    prompt = f"""共 {len(items)} 项：
+{source_json}"""
+    # 每项另外预留JSON引号和分隔符的token
+    max_tokens = sum(translation_max_tokens(value) + 8 for _, value in items)
+    
+    try:
+        content = request_chat_completion(prompt, max_tokens, batch_system_prompt(target_language))
+        if content is None:
+            return None
+        
+        # 截取回复中的 JSON 数组（模型可能包裹在代码块中）
+        start = content.find('[')
+        end = content.rfind(']')
+        if start == -1 or end < start:
+            raise ValueError(f"回复中没有JSON数组: {content}")
+        translations = json_loads(content[start:end + 1])
+        if (not isinstance(translations, list) or len(translations) != len(items)
+                or not all(isinstance(value, str) for value in translations)):
+            raise ValueError(f"回复的数组与原文数量不一致: {content}")
+    except Exception as e:
+        print(f"批量翻译失败，改为逐条翻译: {e}")
+        return None
+    
+    translations = [value.strip() for value in translations]
+    for (key, source_value), translation in zip(items, translations):
+        print(f"AI翻译: \n{key}={source_value}\n{key}={translation}")
+    return translations
+
+def translate_batch_with_retry(items: List[Tuple[str, str]], target_language: str) -> List[Tuple[Optional[str], Optional[dict]]]:
+    """
+    批量翻译配置项，批量请求失败的配置项逐条重新翻译，占位符数量不一致的配置项请AI修正
+    
+    Args:
+        items: (键, 源配置值) 列表
+        target_language: 目标语言代码
+        
+    Returns:
+        List[Tuple[Optional[str], Optional[dict]]]: 与items顺序一致的 translate_with_retry 结果
+    """
+    translations = translate_batch(items, target_language) if len(items) > 1 else None
+    if translations is None:
+        translations = [None] * len(items)
+    
+    results = []
+    for (key, source_value), translation in zip(items, translations):
+        if translation is not None and validate_placeholder_count(source_value, translation):
+            results.append((translation, None))
+        else:
+            # 批量请求失败时逐条翻译，占位符数量不一致时直接修正批量翻译的结果
+            results.append(translate_with_retry(key, source_value, target_language, translation))
+    return results
+
+def open_translation_cache(cache_file: str) -> Optional[sqlite3.Connection]:
+    """
+    打开翻译缓存数据库，不存在时创建
+    
+    Args:
+        cache_file: 缓存文件路径，为空时不使用缓存
+        
+    Returns:
+        Optional[sqlite3.Connection]: 数据库连接，不使用缓存或打开失败时返回None
+    """
+    if not cache_file:
+        return None
+    try:
+        # 多个语言的生成线程共用同一个连接，访问时由 cache_lock 保证串行
+        cache = sqlite3.connect(cache_file, check_same_thread=False)
+        cache.execute('CREATE TABLE IF NOT EXISTS t(h TEXT PRIMARY KEY, v TEXT)')
+        return cache
+    except sqlite3.Error as e:
+        print(f"警告: 打开翻译缓存 {cache_file} 失败，本次不使用缓存: {e}")
+        return None
+
+def translation_cache_key(source_value: str, target_language: str) -> str:
+    """
+    翻译缓存的键，由模型、目标语言和原文决定
+    """
+    return hashlib.sha1(f"{MODEL_NAME}|{target_language}|{source_value}".encode('utf-8')).hexdigest()
+
+def lookup_cached_translation(cache: sqlite3.Connection, source_value: str, target_language: str) -> Optional[str]:
+    """
+    从翻译缓存中查找翻译，未命中时返回None
+    """
+    with cache_lock:
+        row = cache.execute('SELECT v FROM t WHERE h=?',
+                            (translation_cache_key(source_value, target_language),)).fetchone()
+    return row[0] if row is not None else None
+
+def store_cached_translation(cache: sqlite3.Connection, source_value: str, target_language: str,
+                             translation: str) -> None:
+    """
+    写入翻译缓存（提交由 commit_translation_cache 统一完成）
+    """
+    with cache_lock:
+        cache.execute('INSERT OR REPLACE INTO t(h, v) VALUES (?, ?)',
+                      (translation_cache_key(source_value, target_language), translation))
+
+def commit_translation_cache(cache: Optional[sqlite3.Connection]) -> None:
+    """
+    提交翻译缓存的写入
+    """
+    if cache is not None:
+        with cache_lock:
+            cache.commit()
 
 # 全局变量用于保存状态
-current_target_file = None
-current_properties = []
 save_batch_size = 100
-# 记录占位符不匹配的配置项
-placeholder_mismatch_items = []
+# 用户中断时置位，各语言的生成过程在处理下一个配置项前停止，保存进度后退出
+stop_event = threading.Event()
+# 翻译缓存在多个语言的生成线程间共用
+cache_lock = threading.Lock()
 
-def save_properties_to_file(target_file: str, properties: List[Tuple[str, str]]) -> None:
+def save_properties_to_file(target_file: str, properties: List[Tuple[str, str]],
+                            line_ending: str = os.linesep) -> None:
     """
     保存配置项到文件
     
     Args:
         target_file: 目标文件路径
         properties: 配置项列表
+        line_ending: 换行符
     """
     if not properties:
         return
         
-    with open(target_file, 'w', encoding='utf-8') as f:
-        for key, value in properties:
-            f.write(f"{key}={value}\n")
+    # 整个文件内容先拼接并编码为字节，再一次写入
+    data = ''.join(f"{key}={value}{line_ending}" for key, value in properties).encode('utf-8')
+    with open(target_file, 'wb', buffering=1 << 20) as f:
+        f.write(data)
     
     # print(f"已保存 {len(properties)} 个配置项到: {target_file}")
 
+def load_progress_file(progress_file: str) -> Dict[str, str]:
+    """
+    读取上次运行中断时记录的翻译进度
+    
+    Args:
+        progress_file: 进度文件路径（JSONL格式，每行一个 {"k": 键, "v": 翻译}）
+        
+    Returns:
+        Dict[str, str]: 键到翻译的映射，文件不存在时为空
+    """
+    progress = {}
+    if not os.path.exists(progress_file):
+        return progress
+    
+    with open(progress_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                progress[record['k']] = record['v']
+            except (ValueError, KeyError, TypeError):
+                # 写入中途被中断的最后一行
+                continue
+    return progress
+
+def remove_progress_file(progress_file: str) -> None:
+    """
+    目标文件完整保存后删除进度文件
+    """
+    if os.path.exists(progress_file):
+        os.remove(progress_file)
+
+def checkpoint_properties(target_file: str, properties: List[Tuple[str, str]], saved_count: int,
+                          line_ending: str = os.linesep) -> int:
+    """
+    保存进度：只把上次保存之后新增的配置项追加到目标文件，第一次保存时覆盖原文件
+    
+    Args:
+        target_file: 目标文件路径
+        properties: 已生成的配置项列表
+        saved_count: 已写入文件的配置项数量
+        line_ending: 换行符
+        
+    Returns:
+        int: 本次保存后已写入文件的配置项数量
+    """
+    if len(properties) <= saved_count:
+        return saved_count
+    
+    data = ''.join(f"{key}={value}{line_ending}" for key, value in properties[saved_count:]).encode('utf-8')
+    with open(target_file, 'ab' if saved_count else 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(properties)
+
 def signal_handler(signum, frame):
     """
     信号处理函数，用于处理用户中断
     """
     print("\n检测到用户中断，正在保存当前进度...")
-    if current_target_file and current_properties:
-        save_properties_to_file(current_target_file, current_properties)
-        print("进度已保存，程序退出")
+    # 各语言的生成过程检测到中断后各自保存进度
+    stop_event.set()
     sys.exit(0)
 
-def generate_language_properties(source_file: str, target_file: str, target_language: str) -> None:
+def generate_language_properties(source_file: str, target_file: str, target_language: str,
+                                 workers: int = 8, batch_size: int = 20,
+                                 cache: Optional[sqlite3.Connection] = None,
+                                 source_properties: Optional[List[Tuple[str, str]]] = None) -> None:
     """
     根据源配置文件生成目标语言配置文件
     
@@ -248,17 +752,16 @@ def generate_language_properties(source_file: str, target_file: str, target_lang
         source_file: 源配置文件路径
         target_file: 目标配置文件路径
         target_language: 目标语言代码
+        workers: 并发翻译请求的线程数
+        batch_size: 每次请求翻译的配置项数量
+        cache: 翻译缓存数据库连接，为None时不使用缓存
+        source_properties: 已解析的源配置项，为None时解析 source_file
     """
-    global current_target_file, current_properties
-    
-    # 设置信号处理
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
     print(f"正在处理源配置文件: {source_file}")
     
-    # 解析源配置文件
-    source_properties = parse_properties_file(source_file)
+    # 解析源配置文件（同时生成多个语言时由调用方只解析一次）
+    if source_properties is None:
+        source_properties = parse_properties_file(source_file)
     if not source_properties:
         print("错误: 源配置文件为空或不存在")
         return
@@ -267,89 +770,173 @@ def generate_language_properties(source_file: str, target_file: str, target_lang
     
     # 解析现有的目标语言配置文件
     existing_target_properties = {}
+    target_props = []
+    # 保持现有目标文件的换行符，新文件使用当前平台的换行符
+    line_ending = detect_line_ending(target_file)
     if os.path.exists(target_file):
         print(f"发现现有目标配置文件: {target_file}")
         target_props = parse_properties_file(target_file)
         existing_target_properties = {key: value for key, value in target_props}
         print(f"现有目标配置项: {len(existing_target_properties)} 个")
     
-    # 设置全局变量
-    current_target_file = target_file
-    current_properties = []
+    # 上次运行中断前已完成的翻译记录在进度文件中，直接复用
+    progress_file = f"{target_file}.progress.jsonl"
+    progress = load_progress_file(progress_file)
+    if progress:
+        print(f"从进度文件恢复 {len(progress)} 个翻译: {progress_file}")
+        existing_target_properties.update(progress)
     
     # 生成新的目标语言配置文件内容
     new_target_properties = []
+    # 已写入目标文件的配置项数量
+    saved_count = 0
+    completed = False
     added_count = 0
     processed_count = 0
+    # 记录占位符不匹配的配置项
+    placeholder_mismatch_items = []
+    # 记录重试后仍请求失败、暂时使用原文的配置项
+    retry_failed_keys = []
+    
+    # 先确定需要翻译的配置项，再提交到线程池并发翻译
+    need_regenerate_flags = []
+    for key, source_value in source_properties:
+        need_regenerate = False
+        
+        if key in existing_target_properties:
+            # 检查现有翻译的占位符数量，匹配时使用现有翻译
+            existing_value = existing_target_properties[key]
+            if not validate_placeholder_count(source_value, existing_value):
+                # 占位符数量不匹配，需要重新生成
+                source_placeholders = count_placeholders(source_value)
+                existing_placeholders = count_placeholders(existing_value)
+                print(f"检测到现有翻译占位符不匹配: {key}")
+                print(f"  原文占位符数量: {source_placeholders}, 现有翻译占位符数量: {existing_placeholders}")
+                print(f"  将重新生成该项翻译...")
+                need_regenerate = True
+                added_count += 1
+        else:
+            # 没有现有翻译，需要生成新的
+            need_regenerate = True
+            added_count += 1
+        need_regenerate_flags.append(need_regenerate)
+    
+    # 所有配置项都已有翻译且与现有文件的内容和顺序一致时，无需重写文件
+    if not any(need_regenerate_flags):
+        if [(key, existing_target_properties[key]) for key, _ in source_properties] == target_props:
+            print(f"目标配置文件已是最新，无需更新: {target_file}")
+            remove_progress_file(progress_file)
+            return
+    
+    # 不需要请求AI的配置项：键 -> 目标值
+    prefilled_values = {}
+    
+    # 不含中文的原文（URL、数字、占位符、英文标识符等）无需翻译，直接使用原文
+    for (key, source_value), need_regenerate in zip(source_properties, need_regenerate_flags):
+        if need_regenerate and not needs_translation(source_value):
+            prefilled_values[key] = source_value
+    if prefilled_values:
+        print(f"{len(prefilled_values)} 个配置项不含中文，直接使用原文")
+    
+    # 再从缓存中查找相同原文的翻译（不同键名的配置项常有相同的原文）
+    if cache is not None:
+        cached_count = 0
+        for (key, source_value), need_regenerate in zip(source_properties, need_regenerate_flags):
+            if need_regenerate and key not in prefilled_values:
+                cached_value = lookup_cached_translation(cache, source_value, target_language)
+                if cached_value is not None:
+                    prefilled_values[key] = cached_value
+                    cached_count += 1
+        if cached_count:
+            print(f"从翻译缓存中找到 {cached_count} 个配置项的翻译")
+    
+    # 其余需要翻译的配置项按原文去重（常见的"确定"、"取消"等只翻译一次），
+    # 以第一次出现的键作为请求中的代表键，再按 batch_size 分批，每批一次请求
+    keys_by_value: Dict[str, List[str]] = defaultdict(list)
+    for (key, source_value), need_regenerate in zip(source_properties, need_regenerate_flags):
+        if need_regenerate and key not in prefilled_values:
+            keys_by_value[source_value].append(key)
+    todo = [(keys[0], source_value) for source_value, keys in keys_by_value.items()]
+    if len(todo) < sum(len(keys) for keys in keys_by_value.values()):
+        print(f"需要翻译的配置项中有 {len(todo)} 个不同的原文")
+    batch_size = max(1, batch_size)
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+    
+    # 翻译请求以网络等待为主，使用线程并发发送；结果按源文件顺序依次取出
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = [executor.submit(translate_batch_with_retry, batch, target_language) for batch in batches]
+    pending_results = (result for future in futures for result in future.result())
+    
+    # 每批翻译完成后立即追加到进度文件，进程意外退出时已完成的翻译不会丢失
+    progress_fh = open(progress_file, 'a', encoding='utf-8') if batches else None
+    progress_lock = threading.Lock()
+    
+    def record_progress(batch, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        lines = [json.dumps({'k': key, 'v': target_value}, ensure_ascii=False) + '\n'
+                 for (_, source_value), (target_value, mismatch_item) in zip(batch, future.result())
+                 if target_value is not None and mismatch_item is None and target_value != source_value
+                 for key in keys_by_value[source_value]]
+        with progress_lock:
+            if lines and not progress_fh.closed:
+                progress_fh.writelines(lines)
+                progress_fh.flush()
+                os.fsync(progress_fh.fileno())
+    
+    for batch, future in zip(batches, futures):
+        future.add_done_callback(functools.partial(record_progress, batch))
+    
+    # 已取得的翻译结果：原文 -> (翻译, 占位符不匹配信息)，供相同原文的其他键复用
+    translated_values = {}
     
     try:
-        for key, source_value in source_properties:
-            need_regenerate = False
+        for (key, source_value), need_regenerate in zip(source_properties, need_regenerate_flags):
+            # 用户中断时停止处理，已生成的配置项在 finally 中保存
+            if stop_event.is_set():
+                return
             
-            if key in existing_target_properties:
-                # 检查现有翻译的占位符数量
-                existing_value = existing_target_properties[key]
-                if validate_placeholder_count(source_value, existing_value):
-                    # 占位符数量匹配，使用现有翻译
-                    target_value = existing_value
-                    # print(f"保留现有翻译: {key} = {target_value}")
+            if need_regenerate and key in prefilled_values:
+                target_value = prefilled_values[key]
+            elif need_regenerate:
+                if source_value in translated_values:
+                    # 相同原文已翻译过，直接复用
+                    target_value, mismatch_item = translated_values[source_value]
                 else:
-                    # 占位符数量不匹配，需要重新生成
-                    source_placeholders = count_placeholders(source_value)
-                    existing_placeholders = count_placeholders(existing_value)
-                    print(f"检测到现有翻译占位符不匹配: {key}")
-                    print(f"  原文占位符数量: {source_placeholders}, 现有翻译占位符数量: {existing_placeholders}")
-                    print(f"  将重新生成该项翻译...")
-                    need_regenerate = True
-                    added_count += 1
+                    # 等待该项的翻译结果（结果按原文第一次出现的顺序返回）
+                    target_value, mismatch_item = next(pending_results)
+                    translated_values[source_value] = (target_value, mismatch_item)
+                    if target_value is not None and mismatch_item is None and cache is not None \
+                            and target_value != source_value:
+                        # 只缓存占位符匹配的翻译
+                        store_cached_translation(cache, source_value, target_language, target_value)
+                if target_value is None:
+                    # 请求失败，暂时使用原文，在最后的汇总报告中列出
+                    retry_failed_keys.append(key)
+                    target_value = source_value
+                elif mismatch_item:
+                    # 记录占位符不匹配的配置项
+                    placeholder_mismatch_items.append(dict(mismatch_item, key=key))
             else:
-                # 没有现有翻译，需要生成新的
-                need_regenerate = True
-                added_count += 1
-            
-            if need_regenerate:
-                # 生成新的翻译
-                max_retries = 5
-                retry_count = 0
-                target_value = None
-                
-                while retry_count < max_retries:
-                    target_value = translate_property_line(key, source_value, target_language)
-                    
-                    # 验证占位符数量
-                    if validate_placeholder_count(source_value, target_value):
-                        break
-                    else:
-                        retry_count += 1
-                        source_placeholders = count_placeholders(source_value)
-                        translated_placeholders = count_placeholders(target_value)
-                        print(f"警告: 占位符数量不匹配 {key}")
-                        print(f"  原文占位符数量: {source_placeholders}, 翻译占位符数量: {translated_placeholders}")
-                        print(f"  第 {retry_count} 次重试...")
-                        
-                        if retry_count >= max_retries:
-                            print(f"  达到最大重试次数，使用最后一次翻译结果")
-                            # 记录占位符不匹配的配置项
-                            placeholder_mismatch_items.append({
-                                'key': key,
-                                'source_value': source_value,
-                                'translated_value': target_value,
-                                'source_placeholders': source_placeholders,
-                                'translated_placeholders': translated_placeholders
-                            })
-                            break
+                # 占位符数量匹配，使用现有翻译
+                target_value = existing_target_properties[key]
                 
             new_target_properties.append((key, target_value))
-            current_properties = new_target_properties.copy()
             processed_count += 1
             
-            # 每100条保存一次
+            # 每100条保存一次，只追加写入新增的部分
             if processed_count % save_batch_size == 0:
-                save_properties_to_file(target_file, new_target_properties)
+                saved_count = checkpoint_properties(target_file, new_target_properties, saved_count, line_ending)
+                commit_translation_cache(cache)
                 # print(f"批量保存完成，已处理 {processed_count}/{len(source_properties)} 个配置项")
         
         # 最终保存
-        save_properties_to_file(target_file, new_target_properties)
+        save_properties_to_file(target_file, new_target_properties, line_ending)
+        completed = True
+        if progress_fh is not None:
+            with progress_lock:
+                progress_fh.close()
+        remove_progress_file(progress_file)
         
         print(f"\n生成完成!")
         print(f"总配置项: {len(new_target_properties)}")
@@ -370,17 +957,29 @@ def generate_language_properties(source_file: str, target_file: str, target_lang
         else:
             print("\n✅ 所有配置项的占位符数量都匹配正确！")
         
+        # 输出请求失败的配置项汇总
+        if retry_failed_keys:
+            print(f"\n⚠️  共有 {len(retry_failed_keys)} 个配置项重试后仍翻译失败，暂时使用原文:")
+            for key in retry_failed_keys:
+                print(f"  {key}")
+        
     except Exception as e:
         print(f"处理过程中出错: {e}")
-        # 出错时也保存当前进度
-        if current_properties:
-            print("正在保存当前进度...")
-            save_properties_to_file(target_file, current_properties)
         raise
     finally:
-        # 清理全局变量
-        current_target_file = None
-        current_properties = []
+        # 中断或出错时取消尚未开始的翻译请求
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+        # 中断或出错时也保存当前进度
+        if not completed and new_target_properties:
+            print(f"正在保存 {target_language} 的当前进度...")
+            checkpoint_properties(target_file, new_target_properties, saved_count, line_ending)
+            print(f"进度已保存: {target_file}")
+        if progress_fh is not None:
+            with progress_lock:
+                progress_fh.close()
+        commit_translation_cache(cache)
 
 def parse_arguments():
     """
@@ -410,6 +1009,33 @@ def parse_arguments():
         help='目标语言列表 (默认: en)，支持: en, fr, de, ja, ko, es, it, pt, ru, ar 等'
     )
     
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=8,
+        help='并发翻译请求的线程数 (默认: 8)'
+    )
+    
+    parser.add_argument(
+        '-b', '--batch-size',
+        type=int,
+        default=20,
+        help='每次请求翻译的配置项数量 (默认: 20)，设为 1 时逐条翻译'
+    )
+    
+    parser.add_argument(
+        '--rpm',
+        type=int,
+        default=0,
+        help='每分钟最多发送的翻译请求数 (默认: 0，不限制)'
+    )
+    
+    parser.add_argument(
+        '--cache-file',
+        default=os.path.expanduser('~/.i18n4j_cache.sqlite'),
+        help='翻译缓存文件路径 (默认: ~/.i18n4j_cache.sqlite)，设为空字符串时不使用缓存'
+    )
+    
     return parser.parse_args()
 
 def main():
@@ -441,8 +1067,20 @@ def main():
     
     success_count = 0
     total_count = len(args.languages)
+    rate_limiter.rpm = max(0, args.rpm)
+    # 所有语言共用一个翻译缓存
+    cache = open_translation_cache(args.cache_file)
+    # 源配置文件只解析一次，所有语言共用
+    source_properties = parse_properties_file(args.source)
     
+    # 设置信号处理
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+    
+    # 各语言相互独立，同时生成；请求总数由共用的限速器控制
+    executor = ThreadPoolExecutor(max_workers=max(1, total_count))
     try:
+        futures = {}
         for language in args.languages:
             print(f"\n正在生成 {language} 语言配置...")
             
@@ -453,8 +1091,12 @@ def main():
             else:
                 target_file = target_filename
             
+            futures[language] = executor.submit(generate_language_properties, args.source, target_file, language,
+                                                args.workers, args.batch_size, cache, source_properties)
+        
+        for language, future in futures.items():
             try:
-                generate_language_properties(args.source, target_file, language)
+                future.result()
                 success_count += 1
             except Exception as e:
                 print(f"生成 {language} 配置时出错: {e}")
@@ -465,6 +1107,11 @@ def main():
     except Exception as e:
         print(f"程序执行出错: {e}")
         return 1
+    finally:
+        # 等待各语言保存进度后再关闭缓存
+        executor.shutdown(wait=True)
+        if cache is not None:
+            cache.close()
         
     return 0 if success_count == total_count else 1
 
@@ -15,11 +15,15 @@
 
 import os
 import re
+import shutil
 import sys
 import argparse
-import glob
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Set
 
+# 占位符 {数字}、{变量名} 或 {}（与 \{\w*\d*\w*\} 匹配的内容相同，但不会回溯）
+_PLACEHOLDER_RE = re.compile(r'\{\w*\}')
+
 def find_placeholder_keys(properties_file: str) -> Set[str]:
     """
     从properties文件中找出包含占位符的键名
@@ -33,21 +37,22 @@ def find_placeholder_keys(properties_file: str) -> Set[str]:
     placeholder_keys = set()
     
     try:
-        with open(properties_file, 'r', encoding='utf-8') as f:
+        # 大缓冲顺序读取；newline='' 不做换行符转换，行尾的 \r 在去除键和值两端空白时一并去掉
+        with open(properties_file, 'r', encoding='utf-8', buffering=1 << 20, newline='') as f:
             for line in f:
-                line = line.strip()
-                # 跳过空行和注释行
-                if not line or line.startswith('#') or line.startswith('!'):
+                # 跳过空行和注释行（键和值在拆分后各自去除两端空白，这里只需去掉行首空白）
+                line = line.lstrip()
+                if not line or line.startswith(('#', '!')):
                     continue
                     
                 # 查找键值对
-                if '=' in line:
-                    key, value = line.split('=', 1)
+                key, sep, value = line.partition('=')
+                if sep:
                     key = key.strip()
                     value = value.strip()
                     
-                    # 检查值中是否包含占位符 {数字} 或 {变量名}
-                    if re.search(r'\{\w*\d*\w*\}', value):
+                    # 检查值中是否包含占位符 {数字} 或 {变量名}（不含 { 的值无需正则匹配）
+                    if '{' in value and _PLACEHOLDER_RE.search(value):
                         placeholder_keys.add(key)
                         print(f"找到包含占位符的键: {key} = {value}")
                         
@@ -69,47 +74,51 @@ def remove_keys_from_file(properties_file: str, keys_to_remove: Set[str]) -> boo
     Returns:
         是否成功删除
     """
-    if not os.path.exists(properties_file):
-        print(f"警告: 文件 {properties_file} 不存在，跳过")
-        return False
-        
+    # 边读边写到临时文件，完成后替换原文件，内存中只保留当前行
+    # 符号链接解析为实际文件，临时文件建在实际文件旁边，替换后链接仍指向更新后的文件
+    real_file = os.path.realpath(properties_file)
+    tmp_file = real_file + '.tmp'
+    # 可能是待删除键的行：以某个待删除键开头，或以空白开头（键前有缩进）
+    candidate_prefixes = tuple(keys_to_remove) + (' ', '\t', '\f')
     try:
-        # 读取原文件内容
-        with open(properties_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        # 过滤掉要删除的键值对
-        filtered_lines = []
         removed_count = 0
-        
-        for line in lines:
-            original_line = line
-            line_stripped = line.strip()
-            
-            # 跳过空行和注释行
-            if not line_stripped or line_stripped.startswith('#') or line_stripped.startswith('!'):
-                filtered_lines.append(original_line)
-                continue
-                
-            # 检查是否是要删除的键
-            if '=' in line_stripped:
-                key = line_stripped.split('=', 1)[0].strip()
-                if key in keys_to_remove:
-                    print(f"从 {properties_file} 中删除键: {key}")
-                    removed_count += 1
+        # newline='' 读写时都不转换换行符，保留的行原样写回（CRLF文件仍是CRLF）
+        with open(real_file, 'r', encoding='utf-8', buffering=1 << 20, newline='') as src, \
+                open(tmp_file, 'w', encoding='utf-8', buffering=1 << 20, newline='') as dst:
+            for line in src:
+                # 大部分行一次前缀检查即可排除，只有候选行才解析键名
+                if not line.startswith(candidate_prefixes):
+                    dst.write(line)
                     continue
-                    
-            filtered_lines.append(original_line)
+                line_stripped = line.strip()
+                
+                # 检查是否是要删除的键（空行和注释行直接保留）
+                if line_stripped and not line_stripped.startswith(('#', '!')):
+                    key, sep, _ = line_stripped.partition('=')
+                    if sep:
+                        key = key.strip()
+                        if key in keys_to_remove:
+                            print(f"从 {properties_file} 中删除键: {key}")
+                            removed_count += 1
+                            continue
+                        
+                dst.write(line)
             
-        # 写回文件
-        with open(properties_file, 'w', encoding='utf-8') as f:
-            f.writelines(filtered_lines)
+        # 保留原文件的权限后替换原文件
+        shutil.copymode(real_file, tmp_file)
+        os.replace(tmp_file, real_file)
             
         print(f"从 {properties_file} 中删除了 {removed_count} 个键值对")
         return True
         
+    except FileNotFoundError:
+        # 直接打开，不存在时再提示，不必先单独检查文件是否存在
+        print(f"警告: 文件 {properties_file} 不存在，跳过")
+        return False
     except Exception as e:
         print(f"处理文件 {properties_file} 时出错: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
         return False
 
 def find_other_language_files(main_properties_file: str) -> List[str]:
@@ -129,14 +138,18 @@ def find_other_language_files(main_properties_file: str) -> List[str]:
     # 去掉扩展名
     base_name = os.path.splitext(file_name)[0]
     
-    # 构建搜索模式：原文件名_[a-z]+.properties
-    pattern = os.path.join(file_dir, f"{base_name}_[a-z]*.properties")
+    # 文件名模式：原文件名_[a-z]*.properties（与原来的 glob 模式匹配的文件名相同）
+    name_pattern = re.compile(rf'{re.escape(base_name)}_[a-z].*\.properties', re.DOTALL)
     
-    # 查找匹配的文件
-    other_files = glob.glob(pattern)
-    
-    # 过滤掉主文件本身（如果意外匹配到）
-    other_files = [f for f in other_files if os.path.abspath(f) != os.path.abspath(main_properties_file)]
+    # 一次读取目录，DirEntry 自带文件类型信息，不需要逐个 stat
+    other_files = []
+    with os.scandir(file_dir or '.') as entries:
+        for entry in entries:
+            if not name_pattern.fullmatch(entry.name) or not entry.is_file():
+                continue
+            # 过滤掉主文件本身（如果意外匹配到）：候选文件与主文件在同一目录，比较文件名即可
+            if entry.name != file_name:
+                other_files.append(os.path.join(file_dir, entry.name))
     
     return other_files
 
@@ -206,11 +219,11 @@ def main():
     # 2. 从其他语言配置文件中删除这些键值对
     print("\n开始从其他语言配置文件中删除这些键值对...")
     
-    success_count = 0
-    for properties_file in other_properties_files:
-        print(f"\n处理文件: {properties_file}")
-        if remove_keys_from_file(properties_file, placeholder_keys):
-            success_count += 1
+    # 各语言文件互不相关，用线程池同时处理（每条输出都带有文件名）
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(other_properties_files)))) as executor:
+        results = list(executor.map(lambda properties_file: remove_keys_from_file(properties_file, placeholder_keys),
+                                    other_properties_files))
+    success_count = sum(results)
             
     print(f"\n处理完成！成功处理了 {success_count}/{len(other_properties_files)} 个文件")
 
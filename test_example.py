@@ -6,34 +6,26 @@
 """
 
 import os
-import tempfile
+import sys
 from pathlib import Path
-from i18n_extractor import JavaStringExtractor
+from _examples import shared_extractor, temporary_directory
 
-def create_test_java_files():
-    """创建测试用的Java文件"""
-    # 创建临时目录
-    temp_dir = Path(tempfile.mkdtemp())
-    
-    # 创建Maven项目结构
-    src_dir = temp_dir / "src" / "main" / "java" / "com" / "example"
-    src_dir.mkdir(parents=True, exist_ok=True)
-    
-    # 创建pom.xml
-    pom_content = '''<?xml version="1.0" encoding="UTF-8"?>
+# 设置环境变量 I18N_TEST_VERBOSE=1 时逐条列出提取到的字符串（排序后显示），默认只显示数量
+VERBOSE = os.getenv('I18N_TEST_VERBOSE') == '1'
+
+# 测试项目的文件内容，模块加载时编码一次，创建文件时直接写入字节
+# pom.xml
+_POM_XML = '''<?xml version="1.0" encoding="UTF-8"?>
 <project xmlns="http://maven.apache.org/POM/4.0.0">
     <modelVersion>4.0.0</modelVersion>
     <groupId>com.example</groupId>
     <artifactId>test-project</artifactId>
     <version>1.0.0</version>
 </project>
-'''
-    
-    with open(temp_dir / "pom.xml", "w", encoding="utf-8") as f:
-        f.write(pom_content)
-    
-    # 创建测试Java文件1
-    java_content1 = '''
+'''.encode('utf-8')
+
+# 测试Java文件1: UserController.java
+_USER_CONTROLLER_JAVA = '''
 package com.example;
 
 import org.springframework.web.bind.annotation.*;
@@ -94,13 +86,10 @@ public class UserController {
         String logMsg = "User validation completed";
     }
 }
-'''
-    
-    with open(src_dir / "UserController.java", "w", encoding="utf-8") as f:
-        f.write(java_content1)
-    
-    # 创建测试Java文件2
-    java_content2 = '''
+'''.encode('utf-8')
+
+# 测试Java文件2: UserService.java
+_USER_SERVICE_JAVA = '''
 package com.example;
 
 import org.springframework.stereotype.Service;
@@ -180,10 +169,22 @@ public class UserService {
         return "UserService{version=1.0}";  // 纯英文，应该被过滤
     }
 }
-'''
+'''.encode('utf-8')
+
+def create_test_java_files(temp_dir: Path) -> Path:
+    """在指定目录中创建测试用的Java文件"""
+    # 创建Maven项目结构
+    src_dir = temp_dir / "src" / "main" / "java" / "com" / "example"
+    os.makedirs(src_dir, exist_ok=True)
     
-    with open(src_dir / "UserService.java", "w", encoding="utf-8") as f:
-        f.write(java_content2)
+    # 创建pom.xml
+    (temp_dir / "pom.xml").write_bytes(_POM_XML)
+    
+    # 创建测试Java文件1
+    (src_dir / "UserController.java").write_bytes(_USER_CONTROLLER_JAVA)
+    
+    # 创建测试Java文件2
+    (src_dir / "UserService.java").write_bytes(_USER_SERVICE_JAVA)
     
     return temp_dir
 
@@ -191,43 +192,47 @@ def test_extraction():
     """测试字符串提取功能"""
     print("=== Java Spring Boot 国际化字符串提取工具测试 ===")
     
-    # 创建测试项目
-    print("\n1. 创建测试Java项目...")
-    test_project = create_test_java_files()
-    print(f"测试项目创建在: {test_project}")
-    
-    # 创建提取器
-    extractor = JavaStringExtractor()
-    
-    # 扫描项目
-    print("\n2. 扫描Java项目，提取字符串...")
-    extracted_strings = extractor.scan_project(test_project)
-    
-    print(f"\n提取到的字符串 ({len(extracted_strings)} 个):")
-    for i, string in enumerate(sorted(extracted_strings), 1):
-        print(f"  {i:2d}. {string}")
-    
-    # 生成配置文件
-    print("\n3. 生成配置文件...")
-    config_file = test_project / "messages.properties"
-    
-    config = {}
-    for string_value in extracted_strings:
-        key = extractor.generate_key(string_value)
-        config[key] = string_value
-    
-    extractor.save_config(config_file, config)
-    
-    print(f"\n配置文件已生成: {config_file}")
-    print("\n配置文件内容:")
-    with open(config_file, 'r', encoding='utf-8') as f:
-        print(f.read())
-    
-    # 清理
-    print(f"\n测试完成！测试文件位于: {test_project}")
-    print("可以手动删除测试目录，或者保留用于进一步测试。")
+    # 测试项目创建在临时目录中，测试结束后自动删除
+    with temporary_directory() as temp_dir:
+        # 创建测试项目
+        print("\n1. 创建测试Java项目...")
+        test_project = create_test_java_files(Path(temp_dir))
+        print(f"测试项目创建在: {test_project}")
+        
+        # 获取提取器（多次运行时复用同一个实例）
+        extractor = shared_extractor()
+        
+        # 扫描项目
+        print("\n2. 扫描Java项目，提取字符串...")
+        extracted_strings = extractor.scan_project(test_project)
+        
+        if VERBOSE:
+            print(f"\n提取到的字符串 ({len(extracted_strings)} 个):")
+            sys.stdout.write(''.join(f"  {i:2d}. {string}\n"
+                                     for i, string in enumerate(sorted(extracted_strings), 1)))
+        else:
+            print(f"\n提取到 {len(extracted_strings)} 个字符串")
+        
+        # 生成配置文件
+        print("\n3. 生成配置文件...")
+        config_file = test_project / "messages.properties"
+        
+        # 传入已生成的键名，避免不同字符串生成相同的键名而互相覆盖；
+        # 每次生成都要看到之前的键名，所以逐个添加而不是用字典推导式
+        config = {}
+        generate_key = extractor.generate_key
+        existing_keys = config.keys()
+        for string_value in extracted_strings:
+            config[generate_key(string_value, existing_keys=existing_keys)] = string_value
+        
+        # 直接显示写入的内容，不再重新读取文件
+        content = extractor.save_config(config_file, config)
+        
+        print(f"\n配置文件已生成: {config_file}")
+        print("\n配置文件内容:")
+        print(content)
     
-    return test_project, config_file
+    print("\n测试完成！临时测试目录已删除。")
 
 if __name__ == "__main__":
     test_extraction()
\ No newline at end of file
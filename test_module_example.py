@@ -4,22 +4,16 @@
 测试模块前缀功能的示例
 """
 
-import tempfile
 import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from i18n_extractor import JavaStringExtractor
+from _examples import shared_extractor, temporary_directory
 
-def create_test_project():
-    """创建测试用的多模块Maven项目"""
-    # 创建临时目录
-    temp_dir = tempfile.mkdtemp()
-    project_root = Path(temp_dir)
-    
-    print(f"创建测试项目: {project_root}")
-    
-    # 创建根模块的pom.xml
-    root_pom = project_root / "pom.xml"
-    root_pom.write_text("""
+# 测试项目的文件内容，模块加载时编码一次，创建文件时直接写入字节
+# 根模块的pom.xml
+_ROOT_POM = """
 <?xml version="1.0" encoding="UTF-8"?>
 <project>
     <modelVersion>4.0.0</modelVersion>
@@ -28,14 +22,10 @@ def create_test_project():
     <version>1.0.0</version>
     <packaging>pom</packaging>
 </project>
-""", encoding='utf-8')
-    
-    # 创建子模块1: user-service
-    user_service_dir = project_root / "user-service"
-    user_service_dir.mkdir()
-    
-    user_service_pom = user_service_dir / "pom.xml"
-    user_service_pom.write_text("""
+""".encode('utf-8')
+
+# user-service的pom.xml
+_USER_SERVICE_POM = """
 <?xml version="1.0" encoding="UTF-8"?>
 <project>
     <modelVersion>4.0.0</modelVersion>
@@ -43,14 +33,10 @@ def create_test_project():
     <artifactId>user-service</artifactId>
     <version>1.0.0</version>
 </project>
-""", encoding='utf-8')
-    
-    # 创建user-service的Java文件
-    user_java_dir = user_service_dir / "src" / "main" / "java" / "com" / "example" / "user"
-    user_java_dir.mkdir(parents=True)
-    
-    user_controller = user_java_dir / "UserController.java"
-    user_controller.write_text("""
+""".encode('utf-8')
+
+# user-service的Java文件
+_USER_CONTROLLER_JAVA = """
 package com.example.user;
 
 public class UserController {
@@ -63,14 +49,10 @@ public class UserController {
         System.out.println("用户删除失败");
     }
 }
-""", encoding='utf-8')
-    
-    # 创建子模块2: order-service
-    order_service_dir = project_root / "order-service"
-    order_service_dir.mkdir()
-    
-    order_service_pom = order_service_dir / "pom.xml"
-    order_service_pom.write_text("""
+""".encode('utf-8')
+
+# order-service的pom.xml
+_ORDER_SERVICE_POM = """
 <?xml version="1.0" encoding="UTF-8"?>
 <project>
     <modelVersion>4.0.0</modelVersion>
@@ -78,14 +60,10 @@ public class UserController {
     <artifactId>order-service</artifactId>
     <version>1.0.0</version>
 </project>
-""", encoding='utf-8')
-    
-    # 创建order-service的Java文件
-    order_java_dir = order_service_dir / "src" / "main" / "java" / "com" / "example" / "order"
-    order_java_dir.mkdir(parents=True)
-    
-    order_controller = order_java_dir / "OrderController.java"
-    order_controller.write_text("""
+""".encode('utf-8')
+
+# order-service的Java文件
+_ORDER_CONTROLLER_JAVA = """
 package com.example.order;
 
 public class OrderController {
@@ -98,14 +76,10 @@ public class OrderController {
         System.out.println("订单取消成功");
     }
 }
-""", encoding='utf-8')
-    
-    # 创建嵌套模块: order-service/payment-module
-    payment_module_dir = order_service_dir / "payment-module"
-    payment_module_dir.mkdir()
-    
-    payment_module_pom = payment_module_dir / "pom.xml"
-    payment_module_pom.write_text("""
+""".encode('utf-8')
+
+# payment-module的pom.xml
+_PAYMENT_MODULE_POM = """
 <?xml version="1.0" encoding="UTF-8"?>
 <project>
     <modelVersion>4.0.0</modelVersion>
@@ -113,14 +87,10 @@ public class OrderController {
     <artifactId>payment-module</artifactId>
     <version>1.0.0</version>
 </project>
-""", encoding='utf-8')
-    
-    # 创建payment-module的Java文件
-    payment_java_dir = payment_module_dir / "src" / "main" / "java" / "com" / "example" / "payment"
-    payment_java_dir.mkdir(parents=True)
-    
-    payment_service = payment_java_dir / "PaymentService.java"
-    payment_service.write_text("""
+""".encode('utf-8')
+
+# payment-module的Java文件
+_PAYMENT_SERVICE_JAVA = """
 package com.example.payment;
 
 public class PaymentService {
@@ -133,18 +103,56 @@ public class PaymentService {
         System.out.println("退款成功");
     }
 }
-""", encoding='utf-8')
+""".encode('utf-8')
+
+def _mkdirs(paths):
+    """创建目录及其上级目录（已存在时跳过）"""
+    for path in paths:
+        os.makedirs(path, exist_ok=True)
+
+def create_test_project(project_root: Path) -> Path:
+    """在指定目录中创建测试用的多模块Maven项目"""
+    print(f"创建测试项目: {project_root}")
+    
+    # 子模块1: user-service，子模块2: order-service，嵌套模块: order-service/payment-module
+    user_service_dir = project_root / "user-service"
+    order_service_dir = project_root / "order-service"
+    payment_module_dir = order_service_dir / "payment-module"
+    user_java_dir = user_service_dir / "src" / "main" / "java" / "com" / "example" / "user"
+    order_java_dir = order_service_dir / "src" / "main" / "java" / "com" / "example" / "order"
+    payment_java_dir = payment_module_dir / "src" / "main" / "java" / "com" / "example" / "payment"
+    
+    # 一次创建所有Java源码目录，模块目录作为上级目录一并创建
+    _mkdirs([user_java_dir, order_java_dir, payment_java_dir])
+    
+    writes = [
+        # 根模块的pom.xml
+        (project_root / "pom.xml", _ROOT_POM),
+        # user-service的pom.xml和Java文件
+        (user_service_dir / "pom.xml", _USER_SERVICE_POM),
+        (user_java_dir / "UserController.java", _USER_CONTROLLER_JAVA),
+        # order-service的pom.xml和Java文件
+        (order_service_dir / "pom.xml", _ORDER_SERVICE_POM),
+        (order_java_dir / "OrderController.java", _ORDER_CONTROLLER_JAVA),
+        # payment-module的pom.xml和Java文件
+        (payment_module_dir / "pom.xml", _PAYMENT_MODULE_POM),
+        (payment_java_dir / "PaymentService.java", _PAYMENT_SERVICE_JAVA),
+    ]
+    
+    # 各文件互不相关，目录创建好后并发写入
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda item: item[0].write_bytes(item[1]), writes))
     
     return project_root
 
 def test_module_prefix():
     """测试模块前缀功能"""
-    # 创建测试项目
-    project_root = create_test_project()
-    
-    try:
-        # 创建提取器
-        extractor = JavaStringExtractor()
+    # 测试项目创建在临时目录中，测试结束后自动删除
+    with temporary_directory() as temp_dir:
+        project_root = create_test_project(Path(temp_dir))
+        
+        # 获取提取器（多次运行时复用同一个实例）
+        extractor = shared_extractor()
         
         # 扫描项目
         print("\n开始扫描多模块项目...")
@@ -152,31 +160,42 @@ def test_module_prefix():
         
         print(f"\n提取到 {len(extracted_strings)} 个唯一字符串:")
         
-        # 生成键值对并显示
+        # 生成键值对并显示（一次遍历生成所有键值对，生成配置文件时复用；
+        # 已生成的键名传给 generate_key，避免不同字符串生成相同的键名）
+        generated_keys = set()
+        generated_pairs = []
+        generate_key = extractor.generate_key
+        # 按文件分组，每个文件的相对路径只计算一次
+        strings_by_file = defaultdict(list)
         for string_value, file_path in extracted_strings.items():
-            key = extractor.generate_key(string_value, file_path)
-            print(f"{key} = {string_value}")
-            print(f"  文件: {file_path.relative_to(project_root)}")
-            print()
+            strings_by_file[file_path].append(string_value)
+        # 显示内容先收集起来，最后一次写出
+        lines = []
+        for file_path, string_values in strings_by_file.items():
+            relative_path = file_path.relative_to(project_root)
+            for string_value in string_values:
+                key = generate_key(string_value, file_path, generated_keys)
+                generated_keys.add(key)
+                generated_pairs.append((key, string_value))
+                lines.append(f"{key} = {string_value}\n  文件: {relative_path}\n\n")
+        sys.stdout.write(''.join(lines))
         
         # 生成配置文件
         config_path = project_root / "messages.properties"
         existing_config = extractor.load_existing_config(config_path)
         
-        for string_value, file_path in extracted_strings.items():
-            key = extractor.generate_key(string_value, file_path)
-            if key not in existing_config:
-                existing_config[key] = string_value
+        # 只添加配置文件中还没有的键
+        existing_config.update({key: string_value for key, string_value in generated_pairs
+                                if key not in existing_config})
         
-        extractor.save_config(config_path, existing_config)
+        # 直接显示写入的内容，不再重新读取文件
+        content = extractor.save_config(config_path, existing_config)
         
         print(f"配置文件已保存到: {config_path}")
         print("\n配置文件内容:")
-        print(config_path.read_text(encoding='utf-8'))
-        
-    finally:
-        print(f"\n测试完成！测试文件位于: {project_root}")
-        print("可以手动删除测试目录，或者保留用于进一步测试。")
+        print(content)
+    
+    print("\n测试完成！临时测试目录已删除。")
 
 if __name__ == '__main__':
     test_module_prefix()
\ No newline at end of file